@@ -0,0 +1,650 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from sources import open_source
+from telemetry_io import DEFAULT_PACKET_FIELDS, EventLog, LinkStats, PacketFramer, RawCapture, TelemetryLogger, packet_layout, telemetry_headers
+
+# -----------------------------
+# Ground-station engine: serial transport, framing, calibration, history,
+# command channel, CSV / raw logging and link statistics on one asyncio
+# loop in its own thread. Nothing here needs a display: frontends (the
+# DearPyGui window, record_telemetry.py) subscribe to immutable
+# CoreSnapshots and queue commands through send_command().
+#
+# Runs headless against any pyserial URL, e.g. "loop://" or
+# "socket://host:port", as well as real ports, and against the simulator
+# and replay sources in sources.py ("sim://", "replay://...").
+# -----------------------------
+
+DEFAULT_PORT = "COM6"
+BAUD = 115200
+HISTORY_LENGTH = 2 ** 17 # Samples kept per channel (10+ minutes at 200 Hz); plots are decimated to their width
+SNAPSHOT_INTERVAL = 1 / 60 # Seconds between snapshots while data is arriving
+LINK_PUBLISH_INTERVAL = 0.5 # Seconds between link statistics updates in the snapshot
+LINK_LOG_INTERVAL = 5.0 # ...and in the session log
+LOD_FACTOR = 4 # Samples per min/max pair at each pyramid level, relative to the level below
+LOD_MIN_LEVEL = 64 # Coarsest pyramid level keeps at least this many pairs
+DEFAULT_PLOT_POINTS = 1000 # Points per series until the GUI reports its plot width
+DEFAULT_PLOT_WINDOW = 20.0 # Seconds of history shown unless session_config.json or the GUI says otherwise
+DEFAULT_AUTOSCALE_HYSTERESIS = 0.25
+ESTOP_CONFIRM_MASK = 0x7E00 # Relay bits (14..9) a telemetry frame must echo to confirm an E-stop
+ESTOP_CONFIRM_TIMEOUT = 2.0 # Seconds before an unconfirmed E-stop is reported
+
+# --- SESSION CONFIG ---
+
+def load_session(path):
+    with open(path) as f:
+        return json.load(f)
+
+def make_config(session, port=DEFAULT_PORT, num_p=None, num_t=None, num_lc=0, num_sol=6):
+    """Builds the config dict the engine and frontends run from.
+
+    Sensor counts default to the channels listed in session_config.json;
+    the packet layout and calibration follow from them.
+    """
+    packet_cfg = session["packet"]
+    sensor_cfg = session["sensors"]
+    plot_cfg = session.get("plot", {})
+
+    config = {
+        "port": port,
+
+        "packet_fields": packet_cfg.get("fields", DEFAULT_PACKET_FIELDS),
+        "packet_crc": packet_cfg.get("crc"), # e.g. "crc16-ccitt"; None when packets carry no trailer
+
+        "num_p": len(sensor_cfg["pressure"]["channels"]) if num_p is None else num_p,
+        "num_t": len(sensor_cfg["temperature"]["channels"]) if num_t is None else num_t,
+        "num_lc": num_lc,
+
+        "num_sol": num_sol,
+
+        "sensor_type": sensor_cfg["pressure"]["types"],
+
+        "plot_window": plot_cfg.get("window_seconds", DEFAULT_PLOT_WINDOW), # Seconds shown on the scrolling plots
+        # Shrink the Y axis only once the data fills less than 1 - this of it; None rescales every update
+        "autoscale_hysteresis": plot_cfg.get("autoscale_hysteresis", DEFAULT_AUTOSCALE_HYSTERESIS),
+    }
+
+    # Packet format based on total sensors
+    config["total_sensors"] = config["num_p"] + config["num_t"] + config["num_lc"]
+    config["packet_format"], packet_dtype = packet_layout(config["packet_fields"], config["total_sensors"], config["packet_crc"])
+    config["packet_size"] = packet_dtype.itemsize
+    config["cal_scale"], config["cal_offset"] = build_calibration(config, session)
+    return config
+
+def build_calibration(config, session):
+    """Per-channel (scale, offset) arrays so that value = raw * scale + offset.
+
+    Pressure channels map v_min..v_max onto 0..max PSI for their sensor type;
+    other channels stay in raw counts.
+    """
+    adc_cfg = session["adc"]
+    cal_cfg = session["sensors"]["pressure"]["calibration"]
+
+    v_min = cal_cfg["v_min"]
+    v_diff = cal_cfg["v_max"] - v_min
+    unit_voltage = adc_cfg["voltage_range"] / adc_cfg["gain"] / adc_cfg["count_range"]
+
+    scale = np.ones(config["total_sensors"])
+    offset = np.zeros(config["total_sensors"])
+
+    for i in range(config["num_p"]):
+        sensor_type = config["sensor_type"][i] if i < len(config["sensor_type"]) else None
+
+        if sensor_type == "low":
+            p_max = cal_cfg["low_pressure_max"]
+        elif sensor_type == "high":
+            p_max = cal_cfg["high_pressure_max"]
+        else:
+            scale[i] = 0.0 # Unknown sensor type reads as 0
+            continue
+
+        scale[i] = unit_voltage / v_diff * p_max
+        offset[i] = -v_min / v_diff * p_max
+
+    return scale, offset
+
+# --- HISTORY ---
+
+class RingBuffer:
+    """Fixed-size history for several channels in one preallocated array.
+
+    Every sample is written twice, `length` columns apart, so the newest
+    `count` samples are always one contiguous slice.
+    """
+    def __init__(self, channels, length):
+        self.length = length
+        self.data = np.zeros((channels, 2 * length), dtype=np.float64)  # DPG plots take float64
+        self.write_index = 0
+        self.count = 0
+
+    def extend(self, block):
+        """Appends n samples at once; block is shaped (n, channels)."""
+        block = np.asarray(block)
+        n = len(block)
+        if n == 0:
+            return
+
+        if n >= self.length:
+            # Only the newest `length` samples survive; lay them out from column 0
+            block = block[-self.length:].T
+            self.data[:, :self.length] = block
+            self.data[:, self.length:] = block
+            self.write_index = 0
+            self.count = self.length
+            return
+
+        columns = (self.write_index + np.arange(n)) % self.length
+        self.data[:, columns] = block.T
+        self.data[:, columns + self.length] = block.T
+        self.write_index = (self.write_index + n) % self.length
+        self.count = min(self.count + n, self.length)
+
+    def latest(self, channel):
+        """View (not a copy) of a channel's samples, oldest first."""
+        end = self.write_index + self.length
+        return self.data[channel, end - self.count:end]
+
+    def window(self):
+        """View of every channel's samples, oldest first, shaped (channels, count)."""
+        end = self.write_index + self.length
+        return self.data[:, end - self.count:end]
+
+class LodLevel:
+    """One pyramid level: per-block end time, min and max, plus the samples
+    (or finer blocks) still waiting to fill the next block."""
+    def __init__(self, channels, length):
+        self.x = RingBuffer(1, length)
+        self.lo = RingBuffer(channels, length)
+        self.hi = RingBuffer(channels, length)
+        self.rest_x = np.zeros(0)
+        self.rest_lo = np.zeros((0, channels))
+        self.rest_hi = np.zeros((0, channels))
+
+class MinMaxPyramid:
+    """Multi-resolution history so plots cost about one point per pixel.
+
+    Level 0 keeps every sample. Level k keeps one (min, max) pair per
+    LOD_FACTOR**k samples, built incrementally as batches arrive, so a
+    window of any length can be drawn from the finest level that fits the
+    requested number of points without hiding spikes.
+    """
+    def __init__(self, channels, length, factor=LOD_FACTOR):
+        self.channels = channels
+        self.factor = factor
+
+        base = LodLevel(channels, length)
+        base.hi = base.lo # Every sample is its own min and max
+        self.levels = [base]
+
+        while length // factor ** len(self.levels) >= LOD_MIN_LEVEL:
+            self.levels.append(LodLevel(channels, length // factor ** len(self.levels)))
+
+    def extend(self, x, y):
+        """Appends samples: x shaped (n,), y shaped (n, channels)."""
+        base = self.levels[0]
+        base.x.extend(x[:, None])
+        base.lo.extend(y)
+
+        f = self.factor
+        lo = hi = y
+        for level in self.levels[1:]:
+            x = np.concatenate([level.rest_x, x])
+            lo = np.concatenate([level.rest_lo, lo])
+            hi = np.concatenate([level.rest_hi, hi])
+
+            full = len(x) // f * f
+            level.rest_x, level.rest_lo, level.rest_hi = x[full:], lo[full:], hi[full:]
+            if full == 0:
+                break
+
+            # Each block of f entries collapses to its extremes, stamped with its last time
+            x = x[f - 1:full:f]
+            lo = lo[:full].reshape(-1, f, self.channels).min(axis=1)
+            hi = hi[:full].reshape(-1, f, self.channels).max(axis=1)
+            level.x.extend(x[:, None])
+            level.lo.extend(lo)
+            level.hi.extend(hi)
+
+    def latest(self):
+        base = self.levels[0]
+        return base.lo.window()[:, -1].copy() if base.lo.count else np.zeros(self.channels)
+
+    def query(self, start, points):
+        """(x, y) for samples at or after time start, using at most about `points` points.
+
+        y is shaped (channels, len(x)). Coarse levels give each block its min
+        then its max, followed by the unfinished blocks of every finer level
+        so the newest samples are never missing.
+        """
+        for k, level in enumerate(self.levels):
+            xs = level.x.latest(0)
+            i = np.searchsorted(xs, start)
+            if (len(xs) - i) * (1 if k == 0 else 2) <= points:
+                break
+
+        if k == 0:
+            return xs[i:].copy(), level.lo.window()[:, i:].copy()
+
+        x = [xs[i:]]
+        lo = [level.lo.window()[:, i:]]
+        hi = [level.hi.window()[:, i:]]
+        for finer in reversed(self.levels[1:k + 1]):
+            x.append(finer.rest_x)
+            lo.append(finer.rest_lo.T)
+            hi.append(finer.rest_hi.T)
+
+        x = np.concatenate(x)
+        lo = np.concatenate(lo, axis=1)
+        hi = np.concatenate(hi, axis=1)
+        return np.repeat(x, 2), np.stack([lo, hi], axis=2).reshape(self.channels, -1)
+
+class RollingExtrema:
+    """Per-channel min and max over a sliding time window.
+
+    Each channel keeps two monotonic deques of (time, value): a new value
+    evicts every older entry it beats, so the front is always the window's
+    extreme. push() and expire() are amortised O(1) per entry and reading
+    the extremes is O(channels), however long the window.
+    """
+    def __init__(self, channels, window):
+        self.window = window
+        self.mins = [deque() for _ in range(channels)]
+        self.maxs = [deque() for _ in range(channels)]
+
+    def push(self, t, lo, hi):
+        """Adds one entry per channel: lo and hi are the values' extremes at time t."""
+        for q, v in zip(self.mins, lo.tolist()):
+            while q and q[-1][1] >= v:
+                q.pop()
+            q.append((t, v))
+        for q, v in zip(self.maxs, hi.tolist()):
+            while q and q[-1][1] <= v:
+                q.pop()
+            q.append((t, v))
+
+    def expire(self, now):
+        cutoff = now - self.window
+        for q in self.mins + self.maxs:
+            while q and q[0][0] < cutoff:
+                q.popleft()
+
+    def extrema(self):
+        """(min, max) arrays per channel; NaN for channels with nothing in the window."""
+        lo = np.array([q[0][1] if q else np.nan for q in self.mins])
+        hi = np.array([q[0][1] if q else np.nan for q in self.maxs])
+        return lo, hi
+
+# --- ENGINE ---
+
+class CoreSnapshot:
+    """Read-only view of the core's state handed to the GUI.
+
+    Arrays are copies owned by the snapshot, so the GUI can use them for as
+    long as it likes while the core keeps writing its own buffers.
+    """
+    __slots__ = ("version", "channel_versions", "connected", "tick", "solenoid_bits", "latest", "x", "y",
+                 "y_min", "y_max", "frames_good", "frames_bad", "bytes_skipped", "link")
+
+    def __init__(self, version=0, channel_versions=None, connected=False, tick=0.0, solenoid_bits=0, latest=None,
+                 x=None, y=None, y_min=None, y_max=None, frames_good=0, frames_bad=0, bytes_skipped=0, link=None):
+        self.version = version
+        self.channel_versions = np.zeros(0, dtype=np.int64) if channel_versions is None else channel_versions
+        self.connected = connected
+        self.tick = tick # Seconds since connect of the newest sample
+        self.solenoid_bits = solenoid_bits # As reported by the test stand
+        self.latest = latest # Newest calibrated value per channel, or None before the first sample
+        self.x = np.zeros(0) if x is None else x
+        self.y = np.zeros((0, 0)) if y is None else y # Calibrated plot points, shaped (channels, len(x))
+        self.y_min = y_min # Per-channel extremes over the plot window, for autoscale
+        self.y_max = y_max
+        self.frames_good = frames_good
+        self.frames_bad = frames_bad
+        self.bytes_skipped = bytes_skipped
+        self.link = link # Latest LinkStats.snapshot(), or None before the first one
+
+class GroundStationCore:
+    """Owns the serial link for one session.
+
+    config comes from make_config(). start() opens the port (or the
+    source passed in, see sources.py) and runs the asyncio loop in a daemon thread; stop() ends the session and closes
+    its files. The latest state is always available as .snapshot, and
+    every new snapshot is passed to each subscribe()d callback.
+    """
+
+    def __init__(self, config, history_length=HISTORY_LENGTH, event_log=None, baud=BAUD, stamp=None, output_dir=".",
+                 source=None):
+        self.config = config
+        self.baud = baud
+        self.stamp = int(time.time()) if stamp is None else stamp # Names this session's output files
+        self.output_dir = output_dir
+        self.event_log = event_log if event_log is not None else EventLog()
+        self.subscribers = []
+
+        # Calibrated samples and their min/max levels; raw counts only go to the CSV
+        self.history = MinMaxPyramid(config["total_sensors"], history_length)
+        self.plot_window = config.get("plot_window", DEFAULT_PLOT_WINDOW) # Frontends may change: seconds to plot...
+        self.plot_points = DEFAULT_PLOT_POINTS # ...and roughly how many points they can show
+        self.extrema = RollingExtrema(config["total_sensors"], self.plot_window)
+
+        self.snapshot = CoreSnapshot() # Replaced, never mutated: the GUI's lock-free handoff
+        self.version = 0 # Bumped per stored batch
+        self.channel_versions = np.zeros(config["total_sensors"], dtype=np.int64) # Bumped per channel with new samples
+        self.published = 0 # Version in the current snapshot
+        self.tick = 0.0
+        self.solenoid_bits = 0
+        self.link_stats = None
+        self.connected = False
+        self.source = source # Opened from config["port"] by start() if not given
+        self.loop = None
+        self.commands = None
+        self.thread = None
+        self.ready = threading.Event()
+
+        # Serialises port writes between the command writer and the E-stop path
+        self.write_lock = threading.Lock()
+        self.estops = 0 # Bumped per E-stop under write_lock; commands issued before one are dropped
+        self.pending_estop = None # (bits, requested, sent) until a frame confirms it
+
+    # --- Called from other threads ---
+
+    def start(self):
+        if self.source is None:
+            self.source = open_source(self.config["port"], self.config, self.baud)
+        self.connected = True
+        self.thread = threading.Thread(target=asyncio.run, args=(self._main(),), daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self):
+        self.connected = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def subscribe(self, callback):
+        """Calls callback(snapshot) from the engine thread for every new snapshot; keep it quick."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def send_command(self, bits, clear=False):
+        """Queues solenoid command bits; clear=True first drops anything still waiting."""
+        if self.loop is not None and self.connected:
+            # Tagged here, on the caller's thread, so a command issued before an E-stop can't pass as after it
+            self.loop.call_soon_threadsafe(self._enqueue, bits, clear, self.estops)
+
+    def emergency_stop(self, bits):
+        """Writes E-stop bits to the port right away from the calling thread.
+
+        Skips the command queue (and drops whatever is still in it), then
+        times the write and, from the reader, the first telemetry frame whose
+        relay bits match. Returns False (after logging an ERROR) if the bits
+        could not be written.
+        """
+        if not self.connected:
+            self.event_log.error("[ESTOP] 0x%04X NOT SENT: not connected", bits)
+            return False
+
+        requested = time.perf_counter()
+
+        try:
+            with self.write_lock:
+                # Under the lock: nothing tagged before this E-stop can be written after it
+                self.estops += 1
+                self.source.write(f"0x{bits:04X},2\n".encode())
+                self.source.flush() # Returns once the bytes have left the host
+        except Exception as e:
+            self.event_log.error("[ESTOP] 0x%04X NOT SENT: %s", bits, e)
+            return False
+        sent = time.perf_counter()
+
+        self.pending_estop = (bits, requested, sent)
+        self.event_log.warning("[ESTOP] 0x%04X written in %.2f ms", bits, (sent - requested) * 1e3)
+
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._clear_commands)
+
+        return True
+
+    # --- Core loop ---
+
+    def _clear_commands(self):
+        while not self.commands.empty():
+            self.commands.get_nowait()
+
+    def _enqueue(self, bits, clear, estops):
+        if clear:
+            self._clear_commands()
+        self.commands.put_nowait((bits, estops))
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self.commands = asyncio.Queue()
+        self.ready.set()
+
+        config = self.config
+        self.logger = self.capture = self.link = None
+        tasks = []
+
+        try:
+            headers = telemetry_headers(config["num_p"], config["num_t"], config["num_lc"])
+            self.logger = TelemetryLogger(self.output_path("csv"), headers)
+
+            # Every byte off the wire, so any session can be re-decoded with replay_capture.py
+            self.capture = RawCapture(self.output_path("raw"), {
+                "port": config["port"],
+                "baud": self.baud,
+                "packet_format": config["packet_format"],
+                "packet_fields": config["packet_fields"],
+                "packet_crc": config["packet_crc"],
+                "adc_channels": config["total_sensors"],
+                "headers": headers,
+                "started": time.time(),
+            })
+
+            # Event log entries for this session, including periodic link statistics
+            self.event_log.open_file(self.output_path("log"))
+            self.framer = PacketFramer(config["packet_fields"], config["total_sensors"], config["packet_crc"])
+            self.link = LinkStats()
+            self.start_time = time.time()
+
+            self.event_log.info("[SERIAL] Connected to %s", config["port"])
+            self.event_log.info("[SERIAL] Expecting %d payload bytes", config["packet_size"])
+
+            tasks = [asyncio.create_task(t) for t in (self._read_loop(), self._write_loop(), self._stats_loop())]
+
+            # Whichever task fails (or the reader seeing stop()) ends the session
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+        except Exception as e:
+            self.event_log.error("[SERIAL ERROR] Could not start the session: %s", e)
+
+        finally:
+            self.connected = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            if self.link is not None:
+                self.log_link_stats(self.link.snapshot(time.monotonic()))
+                self._publish()
+
+            # One at a time, so a failing close (e.g. a full disk) can't leave the others open
+            for resource in (self.capture, self.logger, self.source):
+                if resource is None:
+                    continue
+                try:
+                    resource.close()
+                except Exception as e:
+                    self.event_log.error("[SERIAL ERROR] Closing %s failed: %s", type(resource).__name__, e)
+
+            if self.capture is not None and self.capture.error is not None:
+                self.event_log.error("[LOG] Raw capture stopped (%s); %d bytes not saved", self.capture.error,
+                                     self.capture.dropped_bytes)
+            self.event_log.close_file()
+
+    def output_path(self, extension):
+        return os.path.join(self.output_dir, f"telemetry_{self.stamp}.{extension}")
+
+    async def _read_loop(self):
+        next_snapshot = time.monotonic()
+
+        try:
+            while self.connected:
+                # Blocks up to READ_TIMEOUT; None means a finite source (replay) has run out
+                incoming = await self.loop.run_in_executor(None, self.source.read)
+                if incoming is None:
+                    self.event_log.info("[SERIAL] Source finished")
+                    break
+                if incoming:
+                    self.capture.write(incoming)
+                    self.framer.feed(incoming)
+                    self._ingest(self.framer.batch())
+
+                now = time.monotonic()
+                if self.version != self.published and now >= next_snapshot:
+                    self._publish()
+                    next_snapshot = now + SNAPSHOT_INTERVAL
+
+        except Exception as e:
+            self.event_log.error("[SERIAL ERROR]: %s", e)
+
+    def _ingest(self, batch):
+        """Stores one decoded batch; everything that arrived in a read goes in together."""
+        if not len(batch):
+            return
+
+        adc_values = batch["adc"]
+        elapsed = time.time() - self.start_time
+        calibrated = adc_values * self.config["cal_scale"] + self.config["cal_offset"]
+
+        # Newest packet only, at most once a second, formatted only if DEBUG is enabled
+        self.event_log.debug("[SERIAL] seq=%d sol=%d adc=%s (%d in batch)", batch["seq"][-1],
+                             batch["solenoids"][-1], adc_values[-1], len(batch), key="packet")
+
+        if self.pending_estop is not None:
+            self._confirm_estop(batch)
+
+        self.solenoid_bits = int(batch["solenoids"][-1])
+        self.tick = elapsed
+        self.history.extend(np.full(len(batch), elapsed), calibrated)
+        self.extrema.push(elapsed, calibrated.min(axis=0), calibrated.max(axis=0)) # One arrival time per batch
+        self.version += 1
+        self.channel_versions += 1 # Packets carry every channel
+
+        self.logger.log_batch(batch)
+        self.link.update(batch["seq"].tolist(), time.monotonic())
+
+    def _confirm_estop(self, batch):
+        bits, requested, sent = self.pending_estop
+        relays = batch["solenoids"] & ESTOP_CONFIRM_MASK
+        matches = np.flatnonzero(relays == (bits & ESTOP_CONFIRM_MASK))
+        if not len(matches):
+            return
+
+        # Every frame in a read shares its arrival time
+        confirmed = time.perf_counter()
+        self.pending_estop = None
+        self.event_log.warning("[ESTOP] confirmed by seq %d: %.1f ms after request (%.2f ms to write, %.1f ms to telemetry)",
+                               batch["seq"][matches[0]], (confirmed - requested) * 1e3,
+                               (sent - requested) * 1e3, (confirmed - sent) * 1e3)
+
+    def _rebuild_extrema(self):
+        """Refills the rolling extremes from history after the GUI changes its window."""
+        self.extrema = RollingExtrema(self.history.channels, self.plot_window)
+
+        base = self.history.levels[0]
+        xs = base.x.latest(0)
+        ys = base.lo.window()
+        for i in range(np.searchsorted(xs, self.tick - self.plot_window), len(xs)):
+            self.extrema.push(xs[i], ys[:, i], ys[:, i])
+
+    def _publish(self):
+        self.published = self.version
+        framer = self.framer
+        x, y = self.history.query(self.tick - self.plot_window, self.plot_points)
+
+        if self.extrema.window != self.plot_window:
+            self._rebuild_extrema()
+        self.extrema.expire(self.tick)
+        y_min, y_max = self.extrema.extrema()
+        self.snapshot = CoreSnapshot(
+            version=self.version,
+            channel_versions=self.channel_versions.copy(),
+            connected=self.connected,
+            tick=self.tick,
+            solenoid_bits=self.solenoid_bits,
+            latest=self.history.latest() if self.version else None,
+            x=x,
+            y=y,
+            y_min=y_min,
+            y_max=y_max,
+            frames_good=framer.good,
+            frames_bad=framer.bad,
+            bytes_skipped=framer.skipped_bytes,
+            link=self.link_stats,
+        )
+
+        for callback in self.subscribers:
+            try:
+                callback(self.snapshot)
+            except Exception as e:
+                self.event_log.error("Snapshot subscriber %s failed: %s", getattr(callback, "__name__", callback), e, key="subscriber")
+
+    async def _write_loop(self):
+        try:
+            while True:
+                cmd_bits, estops = await self.commands.get()
+
+                # Format exactly like Serial Monitor command
+                message = f"0x{cmd_bits:04X},2\n"
+
+                with self.write_lock:
+                    if estops != self.estops:
+                        continue # Queued before an E-stop that has since gone out
+                    self.source.write(message.encode())
+
+                self.event_log.info("[GUI] Sent: %s", message.strip())
+
+        except Exception as e:
+            self.event_log.error("[SERIAL ERROR]: %s", e)
+
+    async def _stats_loop(self):
+        next_log = time.monotonic()
+
+        while True:
+            await asyncio.sleep(LINK_PUBLISH_INTERVAL)
+
+            now = time.monotonic()
+            self.link_stats = self.link.snapshot(now)
+            self._publish()
+
+            if now >= next_log:
+                self.log_link_stats(self.link_stats)
+                next_log = now + LINK_LOG_INTERVAL
+
+            pending = self.pending_estop
+            if pending is not None and time.perf_counter() - pending[2] > ESTOP_CONFIRM_TIMEOUT:
+                self.pending_estop = None
+                self.event_log.error("[ESTOP] 0x%04X not confirmed by telemetry within %.1f s",
+                                     pending[0], ESTOP_CONFIRM_TIMEOUT)
+
+            if self.logger.error is not None:
+                self.event_log.error("[LOG] CSV writer stopped (%s); %d rows not saved", self.logger.error,
+                                     self.logger.dropped, key="csv_writer")
+            if self.capture.error is not None:
+                self.event_log.error("[LOG] Raw capture stopped (%s); %d bytes not saved", self.capture.error,
+                                     self.capture.dropped_bytes, key="raw_capture")
+
+    def log_link_stats(self, stats):
+        self.event_log.info("[LINK] rx=%d lost=%d dup=%d reord=%d wraps=%d resets=%d | loss=%.2f%% rate=%.1f Hz "
+                            "interval=%.1f ms jitter=%.1f ms", stats["received"], stats["lost"], stats["duplicates"],
+                            stats["reordered"], stats["wraps"], stats["resets"], stats["loss_pct"], stats["rate_hz"],
+                            stats["interval_ms"], stats["jitter_ms"])
@@ -1,199 +1,56 @@
-import serial
 import serial.tools.list_ports
-import struct, threading, queue, time, csv
+import threading
 import dearpygui.dearpygui as dpg
-import json
 import os
+import numpy as np
 
-CONFIG_PATH = "session_config.json"
-
-with open(CONFIG_PATH) as f:
-    session = json.load(f)
-
-packet_cfg = session["packet"]
-adc_cfg = session["adc"]
-sensor_cfg = session["sensors"]
-output_cfg = session["output"]
-plot_cfg = session["plot"]
-
-BAUD = 115200
-HISTORY_LENGTH = 150 # Number of ticks to display on the scrolling plots
-
-V_MIN = sensor_cfg["pressure"]["calibration"]["v_min"]
-V_MAX = sensor_cfg["pressure"]["calibration"]["v_max"]
-V_DIFF = V_MAX - V_MIN
-
-HIGH_PRESSURE_MAX = sensor_cfg["pressure"]["calibration"]["high_pressure_max"]
-LOW_PRESSURE_MAX = sensor_cfg["pressure"]["calibration"]["low_pressure_max"]
-
-ADS_VOLTAGE_RANGE = adc_cfg["voltage_range"] / adc_cfg["gain"]
-ADS_COUNT_RANGE = adc_cfg["count_range"]
-
-ADS_UNIT_VOLTAGE = ADS_VOLTAGE_RANGE / ADS_COUNT_RANGE
+from ground_core import DEFAULT_PORT, GroundStationCore, load_session, make_config
+from telemetry_io import LOG_LEVELS, EventLog
 
-config = {
-    "port": "COM6",
-
-    "packet_format": packet_cfg["format"],
-    "packet_size": packet_cfg["size"],
-
-    "num_p": len(sensor_cfg["pressure"]["channels"]),
-    "num_t": len(sensor_cfg["temperature"]["channels"]),
-    "num_lc": 0,
-
-    "num_sol": 6,
-
-    "total_sensors": packet_cfg["adc_channels"],
+CONFIG_PATH = "session_config.json"
+FONT_PATH = "C:/Windows/Fonts/arial.ttf" # DPG's built-in font is used where this doesn't exist
+SIM_PORT = "sim://?rate=200" # Synthetic test stand, listed after the real ports
 
-    "sensor_type": sensor_cfg["pressure"]["types"]
-}
+session = {} # session_config.json, loaded in main()
+config = {} # make_config() result; rebuilt from the setup window on launch
 
 class TelemetryData:
+    """GUI-side state. Telemetry itself lives in the engine and arrives as snapshots."""
     def __init__(self):
-        self.solenoid_bits = 0
         self.cmd_solenoid_bits = 0 # What we want to send
-        self.history_y = {} # Will be populated dynamically
-        self.history_x = {}
-        self.current_tick = 0
-        self.lock = threading.Lock()
-        self.is_connected = False
-        self.serial_port = None
-        self.start_time = time.time()
-        self.last_timestamp = 0
-        self.pressure_zero_offsets = {}
+        self.lock = threading.Lock() # Key handlers run on DPG's callback thread
+        self.core = None # GroundStationCore once connected
+        self.snapshot = None # Latest CoreSnapshot, handed over by receive_snapshot()
+        self.pressure_zero_offsets = np.zeros(0) # Subtracted from calibrated values at render time
+        self.zero_version = 0 # Bumped whenever the zero offsets change
+
+        # What update_gui last pushed to DPG, so unchanged items are left alone
+        self.drawn = {}
+        self.drawn_channels = None # snapshot.channel_versions of the last plotted snapshot
 
 data_store = TelemetryData()
-command_queue = queue.Queue()
+event_log = EventLog() # Shown in the "Event Log" panel; INFO and above are also printed
+log_panel_version = -1
 
 # --- SERIAL LOGIC ---
 
 def get_available_ports():
     ports = [port.device for port in serial.tools.list_ports.comports()]
-    return ports if ports else ["No Ports Found"]
+    # The simulated test stand (sources.py) stays selectable for bench checks without hardware
+    return (ports if ports else ["No Ports Found"]) + [SIM_PORT]
+
+def receive_snapshot(snapshot):
+    """Engine subscriber: runs on the engine thread, so it only swaps the reference."""
+    data_store.snapshot = snapshot
 
 def connect_serial():
+    core = GroundStationCore(config, event_log=event_log)
+    core.subscribe(receive_snapshot)
     try:
-        data_store.serial_port = serial.Serial(config["port"], BAUD, timeout=0.1)
-        data_store.is_connected = True
-        threading.Thread(target=serial_worker, daemon=True).start()
+        core.start()
+        data_store.core = core
     except Exception as e:
-        print(f"Failed to connect: {e}")
-
-def serial_worker():
-
-    log_file = open(f"telemetry_{int(time.time())}.csv", "w", newline='')
-    writer = csv.writer(log_file)
-
-    headers = ["timestamp", "seq", "solenoids"]
-    headers += [f"P_{i}" for i in range(config["num_p"])]
-    headers += [f"T_{i}" for i in range(config["num_t"])]
-    headers += [f"LC_{i}" for i in range(config["num_lc"])]
-    writer.writerow(headers)
-
-    try:
-        ser = data_store.serial_port
-        ser.timeout = 0  # non-blocking
-
-        print(f"[SERIAL] Connected to {config['port']}")
-        print(f"[SERIAL] Expecting {config['packet_size']} payload bytes")
-
-        SYNC = b'\xAA\x55'
-        buffer = bytearray()
-
-        data_store.start_time = time.time()
-
-        while data_store.is_connected:
-
-            # --------------------------
-            # SEND COMMANDS
-            # --------------------------
-            while not command_queue.empty():
-                cmd_bits = command_queue.get()
-
-                # Format exactly like Serial Monitor command
-                message = f"0x{cmd_bits:04X},2\n"
-
-                ser.write(message.encode())
-
-                print(f"[GUI] Sent: {message.strip()}")
-
-            # --------------------------
-            # READ BYTES
-            # --------------------------
-            incoming = ser.read(ser.in_waiting or 1)
-            if incoming:
-                buffer.extend(incoming)
-
-            # --------------------------
-            # PACKET PROCESSING LOOP
-            # --------------------------
-            while True:
-
-                # Need at least 2 bytes to check header
-                if len(buffer) < 2:
-                    break
-
-                # Find sync header
-                sync_index = buffer.find(SYNC)
-
-                if sync_index == -1:
-                    # No header found, discard junk
-                    buffer.clear()
-                    break
-
-                # Remove junk before header
-                if sync_index > 0:
-                    del buffer[:sync_index]
-
-                # Need full header + payload
-                total_packet_size = 2 + config["packet_size"]
-
-                if len(buffer) < total_packet_size:
-                    break
-
-                # Extract payload (skip header)
-                raw = buffer[2:total_packet_size]
-                del buffer[:total_packet_size]
-
-                try:
-                    unpacked = struct.unpack(config["packet_format"], raw)
-                except Exception as e:
-                    print("[SERIAL] Unpack failed:", e)
-                    continue
-
-                ts, seq, mask, stat, solenoids = unpacked[:5]
-                adc_values = unpacked[5:]
-
-                elapsed = time.time() - data_store.start_time
-
-                print(f"[SERIAL] seq={seq} sol={solenoids} adc={adc_values}")
-
-                with data_store.lock:
-                    data_store.solenoid_bits = solenoids
-                    data_store.current_tick = elapsed
-
-                    for idx, val in enumerate(adc_values):
-                        hist_y = data_store.history_y[idx]
-                        hist_x = data_store.history_x[idx]
-
-                        hist_y.append(val)
-                        hist_x.append(elapsed)
-
-                        if len(hist_y) > HISTORY_LENGTH:
-                            hist_y.pop(0)
-                            hist_x.pop(0)
-
-                writer.writerow([ts, seq, f"{solenoids:016b}"] + list(adc_values))
-                log_file.flush()
-
-            time.sleep(0.001)
-
-    except Exception as e:
-        print("[SERIAL ERROR]:", e)
-        data_store.is_connected = False
-
-    finally:
-        log_file.close()
+        event_log.error("Failed to connect: %s", e)
 
 # --- INPUT HANDLING ---
 
@@ -212,9 +69,9 @@ def toggle_solenoid(solenoid_idx):
 
         bits_to_send = data_store.cmd_solenoid_bits
 
-    command_queue.put(bits_to_send)
+    send_command(bits_to_send)
 
-    print(f"Command bits: {bits_to_send:016b}")
+    event_log.info("Command bits: %s", format(bits_to_send, "016b"))
 
 def key_press_handler(sender, app_data):
     """Listens for Shift + Number Row to actuate valves."""
@@ -234,7 +91,7 @@ def key_press_handler(sender, app_data):
 
 def emergency_stop():
     """SHIFT + A: Turn OFF all valves except Valve 4 (index 3)."""
-    print("!!! EMERGENCY STOP ACTIVATED !!!")
+    event_log.warning("!!! EMERGENCY STOP ACTIVATED !!!")
     with data_store.lock:
 
         # Start clean
@@ -249,162 +106,189 @@ def emergency_stop():
 
         bits_to_send = data_store.cmd_solenoid_bits
 
-    # Clear queued commands so E-Stop is immediate
-    while not command_queue.empty():
-        command_queue.get()
+    # Written straight to the port, ahead of (and instead of) anything queued
+    if data_store.core is None:
+        event_log.error("[ESTOP] NOT SENT: not connected")
+        return
 
-    command_queue.put(bits_to_send)
+    if data_store.core.emergency_stop(bits_to_send):
+        event_log.info("Command bits: %s", format(bits_to_send, "016b"))
 
-    print("!!! EMERGENCY STOP ACTIVATED !!!")
-    print(f"Command bits: {bits_to_send:016b}")
+def send_command(bits):
+    if data_store.core is not None:
+        data_store.core.send_command(bits)
 
 def zero_pressures():
-    with data_store.lock:
-        for i in range(config["num_p"]):
-            if len(data_store.history_y[i]) > 0:
-                # Convert centiPSI to PSI
-                psi = data_store.history_y[i][-1] / 10.0
-                data_store.pressure_zero_offsets[i] = psi
+    if data_store.core is None:
+        return
 
-    print("Pressures zeroed.")
+    snapshot = data_store.snapshot
+    if snapshot is not None and snapshot.latest is not None:
+        # Current reading becomes the new zero
+        data_store.pressure_zero_offsets[:config["num_p"]] = snapshot.latest[:config["num_p"]]
+        data_store.zero_version += 1
 
-def convert_pressure(raw_adc, sensor_index):
+    event_log.info("Pressures zeroed.")
 
-    voltage = raw_adc * ADS_UNIT_VOLTAGE
+# --- GUI UPDATE LOOP ---
 
-    if config["ordered_sensor_type"][sensor_index] == "low":
-        psi = (voltage - V_MIN) / V_DIFF * LOW_PRESSURE_MAX
-    elif config["ordered_sensor_type"][sensor_index] == "high":
-        psi = (voltage - V_MIN) / V_DIFF * HIGH_PRESSURE_MAX
-    else:
-        return 0
+def update_log_panel():
+    """Redraws the event log panel, only when new entries have arrived."""
+    global log_panel_version
 
-    zero = data_store.pressure_zero_offsets.get(sensor_index, 0.0)
+    if event_log.version == log_panel_version or not dpg.does_item_exist("log_text"):
+        return
+    log_panel_version = event_log.version
 
-    return psi - zero
-
-# --- GUI UPDATE LOOP ---
+    dpg.set_value("log_text", "\n".join(event_log.lines()))
+    dpg.set_y_scroll("log_window", dpg.get_y_scroll_max("log_window"))
 
 def update_gui():
-    if not data_store.is_connected: return
-        
-    with data_store.lock:
-        # 1. Update Solenoid Feedback Indicators
+    update_log_panel()
+
+    if data_store.core is None or data_store.snapshot is None: return
+
+    # Latest published state; never waits on the engine
+    core = data_store.core
+    snapshot = data_store.snapshot
+    drawn = data_store.drawn
+
+    # 1. Update Solenoid Feedback Indicators (only after a command changes them)
+    cmd_bits = data_store.cmd_solenoid_bits
+    if cmd_bits != drawn.get("cmd_bits"):
+        drawn["cmd_bits"] = cmd_bits
+
         for i in range(config["num_sol"]):
 
             # Relays are mapped to bits 14..9
             bit_position = 14 - i
 
-            is_on = (data_store.cmd_solenoid_bits & (1 << bit_position)) != 0
+            is_on = (cmd_bits & (1 << bit_position)) != 0
 
             status_text = "[ ON ]" if is_on else "[ OFF ]"
             color = (0, 255, 0) if is_on else (255, 50, 50)
 
             dpg.set_value(f"sol_ind_{i}", f"Valve {i+1}: {status_text}")
             dpg.configure_item(f"sol_ind_{i}", color=color)
-        
-        # 2. Helper to update plots and text for a specific category
-        def update_category(cat_prefix, start_idx, count):
 
-            all_vals = []
+    frames = (snapshot.frames_good, snapshot.frames_bad, snapshot.bytes_skipped)
+    if frames != drawn.get("frames"):
+        drawn["frames"] = frames
+        dpg.set_value("link_stats", f"Frames: {snapshot.frames_good} good, {snapshot.frames_bad} bad\n"
+                                    f"Resync skipped: {snapshot.bytes_skipped} B")
+
+    link = snapshot.link
+    if link is not None and link is not drawn.get("link"):
+        drawn["link"] = link
+        dpg.set_value("link_quality", f"Loss: {link['loss_pct']:.1f}%  Rate: {link['rate_hz']:.1f} Hz\n"
+                                      f"Jitter: {link['jitter_ms']:.1f} ms  Lost: {link['lost']}  "
+                                      f"Dup: {link['duplicates']}  Reord: {link['reordered']}")
+
+    # Ask the core for about one point per horizontal pixel of the widest plot
+    widths = [dpg.get_item_rect_size(f"{prefix}_plot_area")[0]
+              for prefix, count in (("P", config["num_p"]), ("T", config["num_t"]), ("LC", config["num_lc"])) if count > 0]
+    if widths and max(widths) > 0:
+        core.plot_points = max(widths)
+    core.plot_window = config["plot_window"]
+
+    # 2. Plots and readouts: only channels with samples newer than what is on screen
+    if snapshot.latest is None:
+        return
 
-            for i in range(count):
-                global_idx = start_idx + i
-
-                if len(data_store.history_y[global_idx]) > 0:
-
-                    y_data = data_store.history_y[global_idx]
-                    x_data = data_store.history_x[global_idx]
-                    if cat_prefix == "P":
-                        current_val = convert_pressure(y_data[-1], i)
-                    else:
-                        current_val = y_data[-1]
-
-                    # Update numeric text
-                    dpg.set_value(f"{cat_prefix}_text_{i}",
-                                f"{cat_prefix}-{i+1}: {current_val:.1f}")
-
-                    # Update plot line
-                    if cat_prefix == "P":
-                        y_plot = [convert_pressure(v, i) for v in y_data]
-                    else:
-                        y_plot = y_data
-
-                    dpg.set_value(f"{cat_prefix}_plot_{i}", [x_data, y_plot])
-
-                    if cat_prefix == "P":
-                        calibrated_vals = [convert_pressure(v, i) for v in y_data]
-                        all_vals.extend(calibrated_vals)
-                    else:
-                        all_vals.extend(y_data)
-
-            # --- X AXIS (20 second rolling window) ---
-            window = 20
-
-            dpg.set_axis_limits(
-                f"{cat_prefix}_x_axis",
-                max(0, data_store.current_tick - window),
-                data_store.current_tick
-            )
-
-            # --- Y AXIS (auto scale with padding) ---
-            if all_vals:
-                ymin = min(all_vals)
-                ymax = max(all_vals)
-
-                if ymin == ymax:
-                    padding = 1
-                else:
-                    padding = (ymax - ymin) * 0.10  # 10% padding
-
-                # Find the Y axis (it is the parent of the line series)
-                y_axis = dpg.get_item_parent(f"{cat_prefix}_plot_0")
-
-                dpg.set_axis_limits(
-                    y_axis,
-                    ymin - padding,
-                    ymax + padding
-                )
-                    
-            # Auto-scroll the X axis for this plot window
-            window = 20
-            dpg.set_axis_limits(f"{cat_prefix}_x_axis", max(0, data_store.current_tick - window), data_store.current_tick)
-        
-        # Update Pressure
-        if config["num_p"] > 0:
-            update_category("P", 0, config["num_p"])
+    if data_store.zero_version != drawn.get("zero") or data_store.drawn_channels is None:
+        changed = np.ones(len(snapshot.channel_versions), dtype=bool)
+    else:
+        changed = snapshot.channel_versions != data_store.drawn_channels
+
+    if not changed.any():
+        return
+
+    drawn["zero"] = data_store.zero_version
+    data_store.drawn_channels = snapshot.channel_versions
+
+    # Helper to update plots and text for a specific category
+    def update_category(cat_prefix, start_idx, count):
+
+        if not changed[start_idx:start_idx + count].any():
+            return
+
+        # Calibrated at ingest; zeroing is just a shift
+        zeros = data_store.pressure_zero_offsets[start_idx:start_idx + count]
+        y_cat = snapshot.y[start_idx:start_idx + count] - zeros[:, None]
+
+        for i in range(count):
+            if not changed[start_idx + i]:
+                continue
+
+            current_val = snapshot.latest[start_idx + i] - zeros[i]
+
+            # Update numeric text
+            dpg.set_value(f"{cat_prefix}_text_{i}",
+                        f"{cat_prefix}-{i+1}: {current_val:.1f}")
+
+            # Update plot line
+            dpg.set_value(f"{cat_prefix}_plot_{i}", [snapshot.x, y_cat[i]])
+
+        # --- X AXIS (rolling window) ---
+        dpg.set_axis_limits(
+            f"{cat_prefix}_x_axis",
+            max(0, snapshot.tick - config["plot_window"]),
+            snapshot.tick
+        )
+
+        # --- Y AXIS (auto scale with padding) ---
+        # Window extremes are kept by the core as data arrives, so this is O(channels)
+        ymin = np.nanmin(snapshot.y_min[start_idx:start_idx + count] - zeros)
+        ymax = np.nanmax(snapshot.y_max[start_idx:start_idx + count] - zeros)
+        if ymin == ymax:
+            padding = 1
+        else:
+            padding = (ymax - ymin) * 0.10  # 10% padding
+
+        limits = (ymin - padding, ymax + padding)
+        current = drawn.get(f"{cat_prefix}_ylim")
+
+        # Grow at once when data leaves the axis; only shrink once it fills too little of it
+        hysteresis = config["autoscale_hysteresis"]
+        if (current is None or hysteresis is None
+                or limits[0] < current[0] or limits[1] > current[1]
+                or limits[1] - limits[0] < (1 - hysteresis) * (current[1] - current[0])):
+            drawn[f"{cat_prefix}_ylim"] = limits
+
+            # Find the Y axis (it is the parent of the line series)
+            y_axis = dpg.get_item_parent(f"{cat_prefix}_plot_0")
 
-        # Update Temp
-        if config["num_t"] > 0:
-            update_category("T", config["num_p"], config["num_t"])
+            dpg.set_axis_limits(y_axis, *limits)
 
-        # Update Load Cell
-        if config["num_lc"] > 0:
-            update_category("LC", config["num_p"] + config["num_t"], config["num_lc"])
+    # Update Pressure
+    if config["num_p"] > 0:
+        update_category("P", 0, config["num_p"])
+
+    # Update Temp
+    if config["num_t"] > 0:
+        update_category("T", config["num_p"], config["num_t"])
+
+    # Update Load Cell
+    if config["num_lc"] > 0:
+        update_category("LC", config["num_p"] + config["num_t"], config["num_lc"])
 
 # --- UI BUILDERS ---
 
 def launch_main_ui():
     """Reads setup config, sets up dynamic structures, and builds main UI."""
-    config["port"] = dpg.get_value("setup_port")
-    config["num_p"] = dpg.get_value("setup_p")
-    config["num_t"] = dpg.get_value("setup_t")
-    config["num_lc"] = dpg.get_value("setup_lc")
-    config["num_sol"] = dpg.get_value("setup_sol")
-    
-    if config["port"] == "No Ports Found" or not config["port"]:
-        print("Invalid COM port selected.")
+    port = dpg.get_value("setup_port")
+
+    if port == "No Ports Found" or not port:
+        event_log.warning("Invalid COM port selected.")
         return
 
-    # Calculate required packet format based on total sensors
-    config["total_sensors"] = config["num_p"] + config["num_t"] + config["num_lc"]
-    config["packet_format"] = f"<IIBBH{config['total_sensors']}H"
-    config["packet_size"] = 12 + (config["total_sensors"] * 2)
-    data_store.pressure_zero_offsets = {i: 0.0 for i in range(config["num_p"])}
-    
-    # Initialize data arrays
-    data_store.history_y = {i: [] for i in range(config["total_sensors"])}
-    data_store.history_x = {i: [] for i in range(config["total_sensors"])}
+    # Packet layout and calibration follow from the sensor counts
+    config.update(make_config(session, port=port,
+                              num_p=dpg.get_value("setup_p"),
+                              num_t=dpg.get_value("setup_t"),
+                              num_lc=dpg.get_value("setup_lc"),
+                              num_sol=dpg.get_value("setup_sol")))
+    data_store.pressure_zero_offsets = np.zeros(config["total_sensors"])
 
     dpg.hide_item("setup_window")
     build_main_windows()
@@ -424,7 +308,7 @@ def build_sensor_window(title, prefix, count, pos):
             dpg.add_button(label="Zero Pressures", callback=zero_pressures)
         
         # Unified Plot
-        with dpg.plot(label="", height=-1, width=-1):
+        with dpg.plot(label="", height=-1, width=-1, tag=f"{prefix}_plot_area"):
             dpg.add_plot_legend()
             dpg.add_plot_axis(dpg.mvXAxis, label="Ticks", no_tick_labels=True, tag=f"{prefix}_x_axis")
             with dpg.plot_axis(dpg.mvYAxis, label="PSI", auto_fit=True):
@@ -439,83 +323,105 @@ def build_main_windows():
         dpg.add_separator()
         for i in range(config["num_sol"]):
             dpg.add_text(f"Valve {i+1}: [ OFF ]", tag=f"sol_ind_{i}", color=(255, 50, 50))
+        dpg.add_separator()
+        dpg.add_text("Frames: 0 good, 0 bad\nResync skipped: 0 B", tag="link_stats")
+        dpg.add_text("Loss: -  Rate: -", tag="link_quality")
 
     # 2. Sensor Windows
     build_sensor_window("Pressure Data", "P", config["num_p"], pos=(320, 10))
     build_sensor_window("Temperature Data", "T", config["num_t"], pos=(10, 320))
     build_sensor_window("Load Cell Data", "LC", config["num_lc"], pos=(470, 320))
 
+    # 3. Event Log (Bottom)
+    with dpg.window(label="Event Log", width=980, height=160, pos=(10, 630), no_close=True):
+        dpg.add_combo(list(LOG_LEVELS), label="Level", default_value="INFO", width=150,
+                      callback=lambda sender, value: setattr(event_log, "level", LOG_LEVELS[value]))
+        with dpg.child_window(tag="log_window", height=-1):
+            dpg.add_text("", tag="log_text")
+
 # --- DPG INITIALIZATION ---
 
-dpg.create_context()
-
-# ---------- CUSTOM FONT ----------
-with dpg.font_registry():
-    default_font = dpg.add_font("C:/Windows/Fonts/arial.ttf", 24)  # adjust size here
-
-dpg.bind_font(default_font)
-
-# ---------------- LIGHT THEME ----------------
-with dpg.theme() as light_theme:
-    with dpg.theme_component(dpg.mvAll):
-        # Backgrounds
-        dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (245, 245, 245, 255))
-        dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (250, 250, 250, 255))
-        dpg.add_theme_color(dpg.mvThemeCol_PopupBg, (255, 255, 255, 255))
-        dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (255, 255, 255, 255))
-
-        # Title bars
-        dpg.add_theme_color(dpg.mvThemeCol_TitleBg, (220, 220, 220, 255))
-        dpg.add_theme_color(dpg.mvThemeCol_TitleBgActive, (200, 200, 200, 255))
-
-        # Buttons
-        dpg.add_theme_color(dpg.mvThemeCol_Button, (220, 220, 220, 255))
-        dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (200, 200, 200, 255))
-        dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (180, 180, 180, 255))
-        dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 4)
-        dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 6, 6)
-
-        # Text
-        dpg.add_theme_color(dpg.mvThemeCol_Text, (0, 0, 0, 255))
-
-        # Plots
-        dpg.add_theme_style(dpg.mvPlotStyleVar_LineWeight, 3)
-
-        # Border
-        dpg.add_theme_style(dpg.mvStyleVar_FrameBorderSize, 2)
-        dpg.add_theme_style(dpg.mvStyleVar_WindowBorderSize, 2)
-
-
-dpg.bind_theme(light_theme)
-# ------------------------------------------------
-
-# Keyboard Handler Registry
-with dpg.handler_registry():
-    dpg.add_key_press_handler(callback=key_press_handler)
-
-# Setup Window (First thing the user sees)
-with dpg.window(label="Test Stand Configuration", tag="setup_window", width=400, height=300, pos=(200, 150), no_close=True):
-    dpg.add_text("Configure Ground Station UI & Telemetry", color=(0, 255, 100))
-    dpg.add_separator()
-    
-    ports = get_available_ports()
-    dpg.add_combo(ports, label="COM Port", tag="setup_port", default_value=config["port"])
-    
-    dpg.add_input_int(label="# of Pressure Sensors", tag="setup_p", default_value=4, min_value=0, max_value=10)
-    dpg.add_input_int(label="# of Temperature Sensors", tag="setup_t", default_value=0, min_value=0, max_value=10)
-    dpg.add_input_int(label="# of Load Cells", tag="setup_lc", default_value=0, min_value=0, max_value=4)
-    dpg.add_input_int(label="# of Solenoids", tag="setup_sol", default_value=5, min_value=1, max_value=9)
-    
-    dpg.add_spacer(height=20)
-    dpg.add_button(label="Launch Ground Station", width=-1, height=40, callback=launch_main_ui)
-
-dpg.create_viewport(title="Liquid Propulsion Ground Station", width=1000, height=800)
-dpg.setup_dearpygui()
-dpg.show_viewport()
-dpg.set_primary_window("setup_window", True)
-
-while dpg.is_dearpygui_running():
-    update_gui()
-    dpg.render_dearpygui_frame()
-
-dpg.destroy_context()
\ No newline at end of file
+def main():
+    session.update(load_session(CONFIG_PATH))
+    config.update(make_config(session))
+
+    dpg.create_context()
+
+    # ---------- CUSTOM FONT ----------
+    if os.path.exists(FONT_PATH):
+        with dpg.font_registry():
+            default_font = dpg.add_font(FONT_PATH, 24)  # adjust size here
+
+        dpg.bind_font(default_font)
+
+    # ---------------- LIGHT THEME ----------------
+    with dpg.theme() as light_theme:
+        with dpg.theme_component(dpg.mvAll):
+            # Backgrounds
+            dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (245, 245, 245, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (250, 250, 250, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_PopupBg, (255, 255, 255, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (255, 255, 255, 255))
+
+            # Title bars
+            dpg.add_theme_color(dpg.mvThemeCol_TitleBg, (220, 220, 220, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_TitleBgActive, (200, 200, 200, 255))
+
+            # Buttons
+            dpg.add_theme_color(dpg.mvThemeCol_Button, (220, 220, 220, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (200, 200, 200, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (180, 180, 180, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 4)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 6, 6)
+
+            # Text
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (0, 0, 0, 255))
+
+            # Plots
+            dpg.add_theme_style(dpg.mvPlotStyleVar_LineWeight, 3)
+
+            # Border
+            dpg.add_theme_style(dpg.mvStyleVar_FrameBorderSize, 2)
+            dpg.add_theme_style(dpg.mvStyleVar_WindowBorderSize, 2)
+
+
+    dpg.bind_theme(light_theme)
+    # ------------------------------------------------
+
+    # Keyboard Handler Registry
+    with dpg.handler_registry():
+        dpg.add_key_press_handler(callback=key_press_handler)
+
+    # Setup Window (First thing the user sees)
+    with dpg.window(label="Test Stand Configuration", tag="setup_window", width=400, height=300, pos=(200, 150), no_close=True):
+        dpg.add_text("Configure Ground Station UI & Telemetry", color=(0, 255, 100))
+        dpg.add_separator()
+
+        ports = get_available_ports()
+        dpg.add_combo(ports, label="COM Port", tag="setup_port", default_value=DEFAULT_PORT)
+
+        dpg.add_input_int(label="# of Pressure Sensors", tag="setup_p", default_value=4, min_value=0, max_value=10)
+        dpg.add_input_int(label="# of Temperature Sensors", tag="setup_t", default_value=0, min_value=0, max_value=10)
+        dpg.add_input_int(label="# of Load Cells", tag="setup_lc", default_value=0, min_value=0, max_value=4)
+        dpg.add_input_int(label="# of Solenoids", tag="setup_sol", default_value=5, min_value=1, max_value=9)
+
+        dpg.add_spacer(height=20)
+        dpg.add_button(label="Launch Ground Station", width=-1, height=40, callback=launch_main_ui)
+
+    dpg.create_viewport(title="Liquid Propulsion Ground Station", width=1000, height=800)
+    dpg.setup_dearpygui()
+    dpg.show_viewport()
+    dpg.set_primary_window("setup_window", True)
+
+    while dpg.is_dearpygui_running():
+        update_gui()
+        dpg.render_dearpygui_frame()
+
+    if data_store.core is not None:
+        data_store.core.stop()
+
+    dpg.destroy_context()
+
+
+if __name__ == "__main__":
+    main()
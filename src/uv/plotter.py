@@ -1,8 +1,11 @@
 import os
+import numpy as np
 import pandas as pd
 import json
 import matplotlib.pyplot as plt
 
+from sd_decoder import read_npz
+
 # Configuration
 
 config_path = r"C:\Users\highp\all\repos\Torito-25-26\src\uv\2.28CF\session_config.json"
@@ -14,10 +17,10 @@ adc_cfg = config["adc"]
 sensor_cfg = config["sensors"]
 output_cfg = config["output"]
 plot_cfg = config["plot"]
-output_file = output_cfg["csv"]
+output_file = output_cfg.get("csv")      # text output, optional
+output_npz_file = output_cfg.get("npz")  # typed columnar output, optional
 
 test_directory = os.path.dirname(config_path)
-output_path = os.path.join(test_directory, output_file)
 data_directory = os.path.join(test_directory, "data")
 
 voltage_range = adc_cfg["voltage_range"] / adc_cfg["gain"]
@@ -25,6 +28,46 @@ count_range = adc_cfg["count_range"]
 
 ADS_UNIT_VOLTAGE = voltage_range / count_range
 
+# Session I/O
+
+SESSION_EXTENSIONS = (".csv", ".npz")
+
+def from_sd_decoder(df):
+    """Renames sd_decoder columns (timestamp_us, raw_adcN, ...) to the names used here."""
+    columns = {"timestamp_us": "timestamp", "solenoid_state": "solenoids"}
+
+    for info in sensor_cfg.values():
+        for i, ch in enumerate(info["channels"]):
+            columns[f"raw_adc{ch}"] = f"{info['prefix']}_{i}"
+
+    return df.rename(columns=columns)
+
+def read_session(path):
+    """Loads a session CSV or .npz, including sd_decoder's CSV / npz output."""
+    if path.endswith(".npz"):
+        df = pd.DataFrame(read_npz(path))
+    else:
+        df = pd.read_csv(path)
+
+    if "timestamp_us" in df.columns:
+        df = from_sd_decoder(df)
+
+    return df
+
+def write_npz(df, path):
+    """Saves each column with its dtype kept; strings become fixed-width unicode."""
+    columns = {}
+
+    for col in df.columns:
+        values = df[col].to_numpy()
+
+        if values.dtype == object:
+            values = values.astype(str)
+
+        columns[col] = values
+
+    np.savez(path, **columns)
+
 # Split Parser
 
 def split_resets(df):
@@ -81,15 +124,25 @@ def convert_sessions(data_directory):
 
     master_rows = []
 
-    for file in os.listdir(data_directory):
+    # One file per session: sd_decoder --format csv,npz writes both, so prefer the typed .npz
+    sessions = {}
 
-        if not file.endswith(".csv") or file == output_file:
+    for file in sorted(os.listdir(data_directory)):
+
+        stem, ext = os.path.splitext(file)
+
+        if ext not in SESSION_EXTENSIONS or file in (output_file, output_npz_file):
             continue
 
+        if ext == ".npz" or stem not in sessions:
+            sessions[stem] = file
+
+    for file in sessions.values():
+
         path = os.path.join(data_directory, file)
 
         try:
-            df = pd.read_csv(path)
+            df = read_session(path)
         except pd.errors.EmptyDataError:
             print(f"Skipping empty file: {file}")
             continue
@@ -213,10 +266,14 @@ master_df = convert_sessions(data_directory)
 # Sort chronologically & reset index
 master_df = master_df.sort_values("time").reset_index(drop=True)
 
-# Write output CSV
+# Write outputs
 
-master_df.to_csv(output_path, index=False)
+if output_file:
+    master_df.to_csv(os.path.join(test_directory, output_file), index=False)
+    print(f"Successful: {output_file}")
 
-plot_sensors(master_df)
+if output_npz_file:
+    write_npz(master_df, os.path.join(test_directory, output_npz_file))
+    print(f"Successful: {output_npz_file}")
 
-print(f"Successful: {output_file}")
\ No newline at end of file
+plot_sensors(master_df)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import argparse
+import time
+from pathlib import Path
+
+from ground_core import DEFAULT_PORT, GroundStationCore, load_session, make_config
+from telemetry_io import EventLog
+
+# -----------------------------
+# Headless recorder: runs the ground-station engine without a display and
+# prints a status line per interval. The engine writes the usual
+# telemetry_<ts>.csv / .raw / .log files.
+# -----------------------------
+
+STATUS_INTERVAL = 1.0 # Seconds between status lines
+
+
+class StatusPrinter:
+    """Engine subscriber that prints at most one status line per interval."""
+
+    def __init__(self, interval=STATUS_INTERVAL):
+        self.interval = interval
+        self.next_print = 0.0
+
+    def __call__(self, snapshot):
+        now = time.monotonic()
+        if now < self.next_print:
+            return
+        self.next_print = now + self.interval
+
+        line = (f"t={snapshot.tick:8.1f}s  frames={snapshot.frames_good} good/{snapshot.frames_bad} bad  "
+                f"skipped={snapshot.bytes_skipped} B")
+
+        link = snapshot.link
+        if link is not None:
+            line += (f"  rate={link['rate_hz']:.1f} Hz  loss={link['loss_pct']:.2f}%  "
+                     f"jitter={link['jitter_ms']:.1f} ms")
+
+        print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record ground-station telemetry without the GUI.")
+    parser.add_argument("--config", type=Path, default=Path("session_config.json"))
+    parser.add_argument("--port", default=DEFAULT_PORT,
+                        help="Serial port, pyserial URL or test source, e.g. COM6, /dev/ttyUSB0, loop://, "
+                             "sim://?rate=200&ber=1e-5, replay://telemetry_<ts>.raw?speed=4")
+    parser.add_argument("--pressure", type=int, default=None,
+                        help="Pressure channels (default: as listed in the config)")
+    parser.add_argument("--temperature", type=int, default=None,
+                        help="Temperature channels (default: as listed in the config)")
+    parser.add_argument("--load-cells", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("."),
+                        help="Directory for the CSV, raw capture and session log")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Seconds to record (default: until Ctrl+C)")
+    parser.add_argument("--interval", type=float, default=STATUS_INTERVAL,
+                        help="Seconds between status lines")
+    args = parser.parse_args()
+
+    config = make_config(load_session(args.config), port=args.port, num_p=args.pressure,
+                         num_t=args.temperature, num_lc=args.load_cells)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    core = GroundStationCore(config, event_log=EventLog(), output_dir=str(args.output))
+    core.subscribe(StatusPrinter(args.interval))
+    core.start()
+
+    deadline = None if args.duration is None else time.monotonic() + args.duration
+
+    try:
+        while core.connected and (deadline is None or time.monotonic() < deadline):
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        core.stop()
+
+    print(f"Saved {core.output_path('csv')}")
+
+
+if __name__ == "__main__":
+    main()
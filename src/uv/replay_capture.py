@@ -0,0 +1,59 @@
+import argparse
+import csv
+from pathlib import Path
+
+from telemetry_io import DEFAULT_PACKET_FIELDS, CaptureReader, PacketFramer, telemetry_row
+
+# -----------------------------
+# Replays a raw ground-station capture (telemetry_<ts>.raw) through the same
+# framer the GUI uses and regenerates its telemetry CSV offline.
+# -----------------------------
+
+def replay(capture_path: Path, output_path: Path):
+    with CaptureReader(capture_path) as reader:
+        meta = reader.metadata
+        framer = PacketFramer(meta.get("packet_fields", DEFAULT_PACKET_FIELDS),
+                              meta.get("adc_channels", len(meta["headers"]) - 3),
+                              meta.get("packet_crc"))
+
+        chunks = 0
+        raw_bytes = 0
+        packets = 0
+
+        with output_path.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(meta["headers"])
+
+            for _, chunk in reader:
+                chunks += 1
+                raw_bytes += len(chunk)
+                framer.feed(chunk)
+
+                batch = framer.batch()
+                writer.writerows(
+                    telemetry_row(ts, seq, solenoids, adc)
+                    for ts, seq, solenoids, adc in zip(batch["timestamp"].tolist(), batch["seq"].tolist(),
+                                                       batch["solenoids"].tolist(), batch["adc"].tolist()))
+                packets += len(batch)
+
+    return chunks, raw_bytes, packets, framer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate telemetry CSV from a raw serial capture.")
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("-o", "--output", type=Path,
+                        help="CSV to write (default: <capture>_replay.csv)")
+    args = parser.parse_args()
+
+    output = args.output or args.capture.with_name(args.capture.stem + "_replay.csv")
+
+    chunks, raw_bytes, packets, framer = replay(args.capture, output)
+
+    print(f"{chunks} chunks, {raw_bytes} bytes → {packets} packets → {output}")
+    if framer.bad or framer.skipped_bytes:
+        print(f"{framer.bad} frames failed CRC, {framer.skipped_bytes} bytes skipped while resyncing")
+
+
+if __name__ == "__main__":
+    main()
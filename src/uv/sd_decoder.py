@@ -1,7 +1,15 @@
-import csv
+import argparse
+import hashlib
+import json
+import mmap
+import os
 import struct
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
+
 # -----------------------------
 # CONFIG
 # -----------------------------
@@ -16,122 +24,743 @@ FRAME_SIZE = struct.calcsize(FRAME_FMT)  # Should be 36 bytes
 
 SENSOR_COUNT = 4
 
+# Mirrors FRAME_FMT so a whole session can be viewed in place with np.frombuffer
+FRAME_DTYPE = np.dtype([
+    ("timestamp_us", "<u4"),
+    ("seq", "<u4"),
+    ("valid_mask", "u1"),
+    ("status_bits", "u1"),
+    ("solenoid_state", "<u2"),
+    ("payload_centi_psi", "<u4", (SENSOR_COUNT,)),
+    ("raw_adc", "<u2", (SENSOR_COUNT,)),
+])
+assert FRAME_DTYPE.itemsize == FRAME_SIZE
+
+HEADERS = [
+    "timestamp_us", "seq", "valid_mask", "status_bits", "solenoid_state",
+    "payload0_centi_psi", "payload1_centi_psi",
+    "payload2_centi_psi", "payload3_centi_psi",
+    "raw_adc0", "raw_adc1", "raw_adc2", "raw_adc3",
+]
+
+CSV_CHUNK_FRAMES = 65536  # Rows formatted per write in write_csv
+SCAN_WINDOW = 64 * 1024 * 1024  # Bytes searched for markers before releasing pages
+STREAM_CHUNK = 1024 * 1024  # Bytes read per step in --stream mode
+
+# --resync: a frame is trusted only if seq steps by one and the timestamp
+# moves forward by less than this since the frame before it
+RESYNC_MAX_GAP_US = 5_000_000
+RESYNC_BLOCK_FRAMES = 65536  # Frames validated per vectorized pass
+RESYNC_WINDOW = 64 * 1024  # Byte offsets tried per vectorized realignment search
+
+# Intervals this long are pauses in logging, not the logging rate
+MAX_INTERVAL_US = 5_000_000
+# An interval longer than this many median intervals counts as a gap
+GAP_FACTOR = 2.0
+
+MANIFEST_VERSION = 2
+FINGERPRINT_BYTES = 4096  # Hashed from each end of a session region
+
 
 # -----------------------------
 # Helpers
 # -----------------------------
-def find_all_markers(data: bytes):
+@contextmanager
+def open_input(path: Path, use_mmap=True):
+    """Yields the input file as a buffer: mapped read-only, or read into RAM."""
+    if not use_mmap:
+        yield path.read_bytes()
+        return
+
+    with path.open("rb") as f:
+        # mmap refuses zero-length files
+        if path.stat().st_size == 0:
+            yield b""
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+
+def release_pages(data, start, end):
+    """Drops mapped pages of an already-decoded region so RSS stays bounded."""
+    if not isinstance(data, mmap.mmap) or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+
+    start -= start % mmap.PAGESIZE
+    if end > start:
+        data.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def find_all_markers(data, start=0):
+    # Works on bytes or an mmap; both search in C without copying. Searching
+    # window by window lets the pages already scanned be released again.
     offsets = []
-    start = 0
-    while True:
-        idx = data.find(MARKER_BYTES, start)
-        if idx == -1:
-            break
-        offsets.append(idx)
-        start = idx + 4
+    window_start = start
+    while window_start < len(data):
+        window_end = min(window_start + SCAN_WINDOW, len(data))
+        while True:
+            idx = data.find(MARKER_BYTES, start, window_end)
+            if idx == -1:
+                break
+            offsets.append(idx)
+            start = idx + 4
+
+        release_pages(data, window_start, window_end)
+
+        # A marker may straddle the window edge
+        start = max(start, window_end - (len(MARKER_BYTES) - 1))
+        window_start = window_end
     return offsets
 
 
-def decode_frames(region: bytes):
-    frames = []
+def decode_frames(region):
+    """Views a session region as frames and returns {column: array}.
 
-    usable_len = len(region) - (len(region) % FRAME_SIZE)
+    No per-frame Python objects are created: every column is a view into the
+    structured array laid over `region`.
+    """
+    count = len(region) // FRAME_SIZE
+    records = np.frombuffer(region, dtype=FRAME_DTYPE, count=count)
 
-    for off in range(0, usable_len, FRAME_SIZE):
-        chunk = region[off:off + FRAME_SIZE]
+    return records_to_columns(records)
 
-        try:
-            vals = struct.unpack(FRAME_FMT, chunk)
-        except struct.error:
-            break
 
-        ts_us, seq, valid_mask, status_bits, sol_state, *rest = vals
-        payload = rest[:SENSOR_COUNT]
-        raw_adc = rest[SENSOR_COUNT:SENSOR_COUNT + SENSOR_COUNT]
-
-        frames.append({
-            "timestamp_us": ts_us,
-            "seq": seq,
-            "valid_mask": valid_mask,
-            "status_bits": status_bits,
-            "solenoid_state": sol_state,
-            "payload0_centi_psi": payload[0],
-            "payload1_centi_psi": payload[1],
-            "payload2_centi_psi": payload[2],
-            "payload3_centi_psi": payload[3],
-            "raw_adc0": raw_adc[0],
-            "raw_adc1": raw_adc[1],
-            "raw_adc2": raw_adc[2],
-            "raw_adc3": raw_adc[3],
-        })
+def records_to_columns(records):
+    frames = {
+        "timestamp_us": records["timestamp_us"],
+        "seq": records["seq"],
+        "valid_mask": records["valid_mask"],
+        "status_bits": records["status_bits"],
+        "solenoid_state": records["solenoid_state"],
+    }
+    for k in range(SENSOR_COUNT):
+        frames[f"payload{k}_centi_psi"] = records["payload_centi_psi"][:, k]
+    for k in range(SENSOR_COUNT):
+        frames[f"raw_adc{k}"] = records["raw_adc"][:, k]
 
     return frames
 
 
+def frames_chain(seq, ts, next_seq, next_ts):
+    """True where (next_seq, next_ts) is a plausible successor of (seq, ts)."""
+    dt = next_ts - ts  # uint32, wraps like micros()
+    return (next_seq == seq + np.uint32(1)) & (dt > 0) & (dt < RESYNC_MAX_GAP_US)
+
+
+def u32_at_every_byte(buf):
+    """Little-endian uint32 starting at every byte offset of `buf`."""
+    b = np.frombuffer(buf, dtype=np.uint8).astype(np.uint32)
+    return b[:-3] | (b[1:-2] << 8) | (b[2:-1] << 16) | (b[3:] << 24)
+
+
+def find_resync(region, start):
+    """First offset >= start where three consecutive frames chain, or None."""
+    span = 3 * FRAME_SIZE
+
+    while len(region) - start >= span:
+        stop = min(start + RESYNC_WINDOW + span, len(region))
+        words = u32_at_every_byte(region[start:stop])
+        n = (stop - start) - span + 1  # Candidate offsets in this window
+
+        def field(frame, offset):
+            lo = frame * FRAME_SIZE + offset
+            return words[lo:lo + n]
+
+        ts0, seq0 = field(0, 0), field(0, 4)
+        ts1, seq1 = field(1, 0), field(1, 4)
+        ts2, seq2 = field(2, 0), field(2, 4)
+        hits = np.flatnonzero(frames_chain(seq0, ts0, seq1, ts1) & frames_chain(seq1, ts1, seq2, ts2))
+
+        if hits.size:
+            return start + int(hits[0])
+        start += n
+
+    return None
+
+
+def decode_frames_resync(region):
+    """Like decode_frames, but survives dropped or torn writes.
+
+    Frames are checked in vectorized blocks for seq continuity and timestamp
+    monotonicity. At the first frame that fails, decoding slides forward one
+    byte at a time (also vectorized) until three consecutive frames chain
+    again. The frame just before a break is dropped too if the realigned
+    frame overlaps it, since that is what a torn write looks like.
+    Returns (frames, skipped_bytes).
+    """
+    runs = []  # [start, end) byte ranges of accepted frames
+    pos = 0
+    last = None  # (seq, ts) of the last accepted frame, as 1-element arrays so uint32 math wraps silently
+    trusted = False  # The frame at pos was just validated by find_resync
+
+    while len(region) - pos >= FRAME_SIZE:
+        count = min((len(region) - pos) // FRAME_SIZE, RESYNC_BLOCK_FRAMES)
+        records = np.frombuffer(region, dtype=FRAME_DTYPE, count=count, offset=pos)
+        seq, ts = records["seq"], records["timestamp_us"]
+
+        ok = np.empty(count, dtype=bool)
+        ok[1:] = frames_chain(seq[:-1], ts[:-1], seq[1:], ts[1:])
+        if last is not None:
+            ok[0] = frames_chain(last[0], last[1], seq[:1], ts[:1])[0]
+        else:
+            # Nothing to compare against yet: the first frame must lead into the next
+            ok[0] = trusted or count == 1 or ok[1]
+
+        bad = np.flatnonzero(~ok)
+        good = int(bad[0]) if bad.size else count
+
+        if good:
+            if runs and runs[-1][1] == pos:
+                runs[-1][1] += good * FRAME_SIZE
+            else:
+                runs.append([pos, pos + good * FRAME_SIZE])
+            last = (seq[good - 1:good], ts[good - 1:good])
+            pos += good * FRAME_SIZE
+        if good == count:
+            continue
+
+        # Search from just inside the last accepted frame in case it was torn
+        search_from = runs[-1][1] - FRAME_SIZE + 1 if last is not None else pos + 1
+        resync = find_resync(region, search_from)
+        if resync is None:
+            break
+
+        if last is not None and resync < runs[-1][1]:
+            runs[-1][1] -= FRAME_SIZE
+            if runs[-1][0] == runs[-1][1]:
+                runs.pop()
+
+        pos = resync
+        last = None
+        trusted = True
+
+    if len(runs) == 1:
+        records = np.frombuffer(region, dtype=FRAME_DTYPE,
+                                count=(runs[0][1] - runs[0][0]) // FRAME_SIZE, offset=runs[0][0])
+    else:
+        # Joining the raw bytes is far cheaper than np.concatenate on a structured dtype
+        joined = b"".join(region[start:end] for start, end in runs)
+        records = np.frombuffer(joined, dtype=FRAME_DTYPE)
+
+    skipped = len(region) - len(records) * FRAME_SIZE
+
+    return records_to_columns(records), skipped
+
+
+def frame_count(frames):
+    return len(frames["timestamp_us"])
+
+
+def open_csv(path: Path):
+    """Creates `path` with the header row written and returns the open file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    f = path.open("w", newline="")
+    # Same \r\n line endings the csv module produced
+    f.write(",".join(HEADERS) + "\r\n")
+    return f
+
+
+def format_csv_rows(columns):
+    """Formats uint8/16/32 columns as \\r\\n-terminated CSV rows without a per-row Python loop.
+
+    Each value is written as a fixed-width run of decimal digits, least
+    significant first, into a (byte position, row) matrix; leading zeros are
+    then masked out and the kept bytes joined in one step. Same text as
+    np.savetxt(fmt="%d"), several times faster; --format npz is faster still.
+    """
+    rows = len(columns[0])
+    widths = [len(str(np.iinfo(col.dtype).max)) for col in columns]
+    line = sum(widths) + len(columns) + 1  # Digits, a comma between values, \r\n
+    chars = np.empty((line, rows), dtype=np.uint8)
+    keep = np.ones((line, rows), dtype=bool)
+
+    end = -1
+    for col, width in zip(columns, widths):
+        end += width + 1  # This value's comma
+        chars[end] = ord(",")
+        values = col.astype(np.uint32)
+        for place in range(width):
+            values, digit = np.divmod(values, 10)
+            chars[end - 1 - place] = digit + ord("0")
+            if place + 1 < width:
+                keep[end - 2 - place] = values != 0
+
+    chars[end] = ord("\r")  # Replaces the last comma
+    chars[end + 1] = ord("\n")
+    return chars.T[keep.T].tobytes().decode("ascii")
+
+
+def append_csv(f, frames):
+    total = frame_count(frames)
+    for lo in range(0, total, CSV_CHUNK_FRAMES):
+        hi = min(lo + CSV_CHUNK_FRAMES, total)
+        f.write(format_csv_rows([frames[h][lo:hi] for h in HEADERS]))
+
+
 def write_csv(frames, path: Path):
+    with open_csv(path) as f:
+        append_csv(f, frames)
+
+
+# -----------------------------
+# Output writers
+# -----------------------------
+class CsvWriter:
+    suffix = ".csv"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.f = open_csv(path)
+
+    def write(self, frames):
+        append_csv(self.f, frames)
+
+    def close(self):
+        self.f.close()
+
+
+class NpzWriter:
+    """Typed columns (u32 timestamps, u16 ADC, ...) in one uncompressed .npz.
+
+    np.savez needs whole arrays, so blocks are buffered until close().
+    """
+    suffix = ".npz"
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Zero-length columns keep the dtypes when a session has no frames
+        self.blocks = [decode_frames(b"")]
+
+    def write(self, frames):
+        # Copy: the columns are views into a buffer the caller may release
+        self.blocks.append({h: np.array(frames[h]) for h in HEADERS})
+
+    def close(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        columns = {h: np.concatenate([b[h] for b in self.blocks]) for h in HEADERS}
+        np.savez(self.path, **columns)
+        self.blocks = []
+
+
+WRITERS = {
+    "csv": CsvWriter,
+    "npz": NpzWriter,
+}
+
+
+def open_writers(output_dir: Path, index, formats):
+    return [WRITERS[fmt](output_dir / f"session_{index:03d}{WRITERS[fmt].suffix}") for fmt in formats]
+
+
+def read_npz(path: Path):
+    """Loads a session written by NpzWriter back as {column: array}."""
+    with np.load(path) as npz:
+        return {h: npz[h] for h in npz.files}
+
+
+def timing_stats(ts):
+    """Frame interval statistics for one session's timestamp_us column.
+
+    Deltas are taken in uint32, so micros() rollover is handled. Mean, median,
+    p99 and jitter (std) ignore steps backwards and pauses of MAX_INTERVAL_US
+    or more; gaps are any interval over GAP_FACTOR x the median.
+    """
+    if len(ts) < 2:
+        return None
+
+    deltas = np.diff(ts)
+    # A timestamp reset shows up as a huge wrapped delta
+    backward = deltas >= 0x80000000
+    steady = deltas[(deltas > 0) & (deltas < MAX_INTERVAL_US)]
+
+    if steady.size == 0:
+        return None
+
+    mean = float(steady.mean())
+    median, p99 = (float(v) for v in np.percentile(steady, [50, 99]))
+    gaps = deltas[(deltas > GAP_FACTOR * median) & ~backward]
+
+    return {
+        "rate_hz": 1_000_000.0 / mean,
+        "mean_interval_us": mean,
+        "median_interval_us": median,
+        "p99_interval_us": p99,
+        "jitter_us": float(steady.std()),
+        "gap_count": int(gaps.size),
+        "longest_gap_us": int(gaps.max()) if gaps.size else 0,
+        "backward_steps": int(np.count_nonzero(backward)),
+    }
+
+
+def write_summary(output_dir: Path, index, ts, skipped=None):
+    """Writes session_NNN_summary.json with frame count and timing health."""
+    path = output_dir / f"session_{index:03d}_summary.json"
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    headers = [
-        "timestamp_us", "seq", "valid_mask", "status_bits", "solenoid_state",
-        "payload0_centi_psi", "payload1_centi_psi",
-        "payload2_centi_psi", "payload3_centi_psi",
-        "raw_adc0", "raw_adc1", "raw_adc2", "raw_adc3",
-    ]
+    stats = timing_stats(ts)
+    summary = {
+        "session": index,
+        "frames": len(ts),
+        "skipped_bytes": skipped,
+        "timing": stats,
+    }
+    path.write_text(json.dumps(summary, indent=2))
+
+    return path, stats
+
+
+def iter_session_blocks(f, chunk_size=STREAM_CHUNK):
+    """Scans a binary file object chunk by chunk, yielding (session_index, frames).
+
+    Blocks are yielded as soon as enough whole frames are buffered, so the
+    first session can be written while the rest of the file is still being
+    read. Every session yields at least once (on its closing marker or EOF),
+    even when it holds no frames. Bytes before the first marker are skipped.
+    """
+    session = -1
+    pending = bytearray()
+    # The last few bytes of a chunk may be the start of a split marker
+    keep = len(MARKER_BYTES) - 1
+
+    while True:
+        chunk = f.read(chunk_size)
+        pending += chunk
+
+        while True:
+            idx = pending.find(MARKER_BYTES)
+            if idx == -1:
+                break
+            if session >= 0:
+                yield session, decode_frames(bytes(pending[:idx]))
+            session += 1
+            del pending[:idx + len(MARKER_BYTES)]
+
+        if not chunk:
+            if session >= 0:
+                yield session, decode_frames(bytes(pending))
+            return
+
+        safe = len(pending) - keep
+        if session < 0:
+            del pending[:max(safe, 0)]
+            continue
+
+        usable = safe - safe % FRAME_SIZE
+        if usable > 0:
+            # Copy out so `pending` can still be resized under the array
+            yield session, decode_frames(bytes(pending[:usable]))
+            del pending[:usable]
+
+
+def decode_session(view, index, start, end, output_dir: Path, formats=("csv",), resync=False):
+    """Decodes one marker-delimited region of `view` and writes it in each format.
+
+    Returns (output_paths, frame_count, rate, skipped_bytes); skipped_bytes is
+    None unless `resync` is set.
+    """
+    if resync:
+        frames, skipped = decode_frames_resync(view[start:end])
+    else:
+        frames, skipped = decode_frames(view[start:end]), None
+
+    writers = open_writers(output_dir, index, formats)
+    for writer in writers:
+        writer.write(frames)
+        writer.close()
+
+    summary_path, stats = write_summary(output_dir, index, frames["timestamp_us"], skipped)
+    rate = stats["rate_hz"] if stats else None
+
+    return [w.path for w in writers] + [summary_path], frame_count(frames), rate, skipped
+
+
+def decode_session_worker(input_path: Path, index, start, end, output_dir: Path, formats=("csv",), resync=False):
+    """Process-pool entry point. Each worker maps the input itself, so all of
+    them share the same page cache instead of receiving copies of the region."""
+    with open_input(input_path) as data:
+        with memoryview(data) as view:
+            result = decode_session(view, index, start, end, output_dir, formats, resync)
+        release_pages(data, start, end)
+
+    return result
+
+
+# -----------------------------
+# Incremental manifest
+# -----------------------------
+def manifest_path(output_dir: Path):
+    # Kept next to the output folder, e.g. decoded_manifest.json
+    return output_dir.with_name(output_dir.name + "_manifest.json")
+
+
+def manifest_options(args):
+    return {"formats": sorted(args.formats), "resync": args.resync}
+
+
+def region_fingerprint(view, start, end):
+    """Hash of a region's length plus its first and last FINGERPRINT_BYTES.
 
-    with path.open("w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(frames)
+    Reading only the ends keeps re-runs fast however much history is on the
+    card. An edit confined to the middle of an old session is not detected;
+    use --force after anything other than appending to data.bin.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update((end - start).to_bytes(8, "little"))
+    h.update(view[start:min(end, start + FINGERPRINT_BYTES)])
+    h.update(view[max(start, end - FINGERPRINT_BYTES):end])
+    return h.hexdigest()
 
 
-def estimate_rate(frames):
-    if len(frames) < 2:
+def load_manifest(args):
+    path = manifest_path(args.output)
+    if args.force or not path.exists():
         return None
 
-    deltas = []
-    for i in range(1, len(frames)):
-        dt = (frames[i]["timestamp_us"] - frames[i-1]["timestamp_us"]) & 0xFFFFFFFF
-        if 0 < dt < 5_000_000:
-            deltas.append(dt)
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        print(f"WARNING: ignoring unreadable {path}: {e}")
+        return None
 
-    if not deltas:
+    # Different formats or decode mode means every output has to be rebuilt
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("options") != manifest_options(args):
         return None
+    return manifest
+
+
+def save_manifest(args, input_size, entries):
+    path = manifest_path(args.output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "input": str(args.input),
+        "input_size": input_size,
+        "options": manifest_options(args),
+        "sessions": entries,
+    }
+
+    # Write then rename so an interrupted run never leaves half a manifest
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(path)
+
+
+def resume_scan(view, manifest):
+    """Returns (trusted_markers, scan_start) for a re-run against `manifest`.
+
+    Markers of sessions whose fingerprints still match are reused; the marker
+    scan only has to cover the rest of the file.
+    """
+    if manifest is None:
+        return [], 0
+
+    entries = manifest["sessions"]
+    trusted = []
+    for entry in entries:
+        start, end = entry["start"], entry["end"]
+        if end > len(view) or view[start - len(MARKER_BYTES):start] != MARKER_BYTES:
+            break
+        if region_fingerprint(view, start, end) != entry["fingerprint"]:
+            break
+        trusted.append(start - len(MARKER_BYTES))
 
-    avg_dt = sum(deltas) / len(deltas)
-    return 1_000_000.0 / avg_dt
+    if not trusted:
+        return [], 0
+
+    if len(trusted) == len(entries) and entries[-1]["end"] == manifest["input_size"]:
+        # Everything up to the old end of file was already scanned
+        return trusted, max(entries[-1]["start"], manifest["input_size"] - (len(MARKER_BYTES) - 1))
+
+    return trusted, trusted[-1] + len(MARKER_BYTES)
+
+
+def session_unchanged(entry, start, end, fingerprint):
+    return (
+        entry is not None
+        and entry["start"] == start
+        and entry["end"] == end
+        and entry["fingerprint"] == fingerprint
+        and all(Path(p).exists() for p in entry["outputs"])
+    )
 
 
 # -----------------------------
 # Main
 # -----------------------------
-def main():
-    if not INPUT_FILE.exists():
-        print("ERROR: data.bin not found in project root.")
-        return
+def parse_args():
+    parser = argparse.ArgumentParser(description="Decode SD card session logs to CSV/NPZ.")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE)
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--no-mmap", action="store_true",
+                        help="read the whole file into RAM instead of mapping it")
+    parser.add_argument("--stream", action="store_true",
+                        help="scan in chunks and write each session while the file is still being read")
+    parser.add_argument("--format", default="csv",
+                        help=f"comma-separated output formats: {', '.join(WRITERS)} "
+                             "(npz skips text formatting; fastest for large cards)")
+    parser.add_argument("--resync", action="store_true",
+                        help="validate seq/timestamps and realign after torn or corrupted frames")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore the manifest and decode every session again")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="decode sessions in this many worker processes (0 = one per core)")
+
+    args = parser.parse_args()
+    args.formats = [fmt.strip() for fmt in args.format.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in args.formats if fmt not in WRITERS]
+    if unknown or not args.formats:
+        parser.error(f"unknown --format {', '.join(unknown)}; choose from {', '.join(WRITERS)}")
+    return args
+
+
+def report_session(index, output_files, count, rate, skipped=None):
+    rate_str = f"{rate:.2f} Hz" if rate else "unknown"
+    outputs = ", ".join(str(p) for p in output_files)
+    skipped_str = f" | Skipped: {skipped} bytes" if skipped is not None else ""
+
+    print(f"Session {index:03d}: {count} frames → {outputs} | Estimated rate: {rate_str}{skipped_str}")
+
+
+def run_indexed(args):
+    manifest = load_manifest(args)
+    previous = {entry["index"]: entry for entry in manifest["sessions"]} if manifest else {}
+
+    with open_input(args.input, use_mmap=not args.no_mmap) as data:
+        # Slicing a memoryview shares the mapped pages instead of copying them
+        with memoryview(data) as view:
+            trusted, scan_start = resume_scan(view, manifest)
+            markers = trusted + find_all_markers(data, scan_start)
+
+            if not markers:
+                print("ERROR: No session marker found.")
+                return
+
+            print(f"Found {len(markers)} session marker(s).")
+
+            sessions = [
+                (i, pos + 4, markers[i + 1] if i + 1 < len(markers) else len(data))
+                for i, pos in enumerate(markers)
+            ]
+            fingerprints = {i: region_fingerprint(view, start, end) for i, start, end in sessions}
+
+            todo = [
+                (i, start, end) for i, start, end in sessions
+                if not session_unchanged(previous.get(i), start, end, fingerprints[i])
+            ]
+            if len(todo) < len(sessions):
+                print(f"{len(sessions) - len(todo)} unchanged session(s) skipped.")
+
+            if args.jobs > 1:
+                results = run_parallel(args, todo)
+            else:
+                results = {}
+                for i, start, end in todo:
+                    results[i] = decode_session(view, i, start, end, args.output, args.formats, args.resync)
+                    release_pages(data, start, end)
+
+                    report_session(i, *results[i])
+
+        input_size = len(data)
+
+    entries = []
+    for i, start, end in sessions:
+        if i not in results:
+            entries.append(previous[i])
+            continue
+
+        output_files, count, rate, skipped = results[i]
+        entries.append({
+            "index": i,
+            "start": start,
+            "end": end,
+            "fingerprint": fingerprints[i],
+            "outputs": [str(p) for p in output_files],
+            "frames": count,
+            "rate": rate,
+            "skipped": skipped,
+        })
 
-    data = INPUT_FILE.read_bytes()
-    markers = find_all_markers(data)
+    save_manifest(args, input_size, entries)
 
-    if not markers:
+
+def run_parallel(args, sessions):
+    # Largest sessions first so one long test doesn't end up queued last
+    order = sorted(sessions, key=lambda s: s[2] - s[1], reverse=True)
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            i: pool.submit(decode_session_worker, args.input, i, start, end,
+                           args.output, args.formats, args.resync)
+            for i, start, end in order
+        }
+
+        # Report in session order regardless of which worker finishes first
+        for i, _, _ in sessions:
+            results[i] = futures[i].result()
+            report_session(i, *results[i])
+
+    return results
+
+
+def run_streaming(args):
+    index = None
+    writers = None
+
+    def finish():
+        for writer in writers:
+            writer.close()
+        summary_path, stats = write_summary(args.output, index, np.concatenate(timestamps))
+        rate = stats["rate_hz"] if stats else None
+        report_session(index, [w.path for w in writers] + [summary_path], count, rate)
+
+    with args.input.open("rb") as f:
+        for i, frames in iter_session_blocks(f):
+            if i != index:
+                if writers is not None:
+                    finish()
+                index = i
+                writers = open_writers(args.output, i, args.formats)
+                timestamps = []
+                count = 0
+
+            for writer in writers:
+                writer.write(frames)
+            timestamps.append(frames["timestamp_us"].copy())
+            count += frame_count(frames)
+
+    if writers is None:
         print("ERROR: No session marker found.")
         return
 
-    print(f"Found {len(markers)} session marker(s).")
+    finish()
 
-    for i, marker_pos in enumerate(markers):
-        start = marker_pos + 4
-        end = markers[i + 1] if i + 1 < len(markers) else len(data)
 
-        region = data[start:end]
-        frames = decode_frames(region)
-
-        output_file = OUTPUT_DIR / f"session_{i:03d}.csv"
-        write_csv(frames, output_file)
+def main():
+    args = parse_args()
 
-        rate = estimate_rate(frames)
-        rate_str = f"{rate:.2f} Hz" if rate else "unknown"
+    if not args.input.exists():
+        print(f"ERROR: {args.input} not found.")
+        return
 
-        print(f"Session {i:03d}: {len(frames)} frames → {output_file} | Estimated rate: {rate_str}")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+
+    if args.stream:
+        if args.jobs > 1:
+            print("ERROR: --stream decodes sessions in file order and can't be combined with --jobs.")
+            return
+        if args.resync:
+            print("ERROR: --resync needs whole sessions and can't be combined with --stream.")
+            return
+        run_streaming(args)
+    else:
+        run_indexed(args)
 
     print("\nDone.")
 
@@ -0,0 +1,270 @@
+import csv
+import re
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import serial
+
+from telemetry_io import PACKET_CRCS, SYNC, CaptureReader, packet_layout
+
+# -----------------------------
+# Byte sources for the ground-station engine. Every source has
+#   read()   -> bytes that arrived, b"" after READ_TIMEOUT with nothing new,
+#               or None once a finite source is used up
+#   write(data), flush(), close()
+# open_source() picks one from the port string, so anything that takes a
+# port also takes:
+#   sim://?rate=50&noise=40&ber=1e-5&burst=1&seed=0   synthetic test stand
+#   replay://path/to/telemetry_<ts>.raw?speed=4        raw capture or CSV
+# Any other string is opened as a serial port / pyserial URL.
+# -----------------------------
+
+READ_TIMEOUT = 0.05 # Max seconds read() blocks
+CSV_TIMESTAMP_SCALE = 1e-6 # Seconds per unit of the CSV timestamp column (firmware micros())
+SIM_UNTHROTTLED_BATCH = 256 # Packets per read() when the simulator runs with rate=0
+SIM_COUNTS_MID = 16000 # ADC count the synthetic channels oscillate around
+SIM_COUNTS_SWING = 4000
+
+COMMAND_PATTERN = re.compile(rb"0x([0-9A-Fa-f]{4}),2")
+
+
+def open_source(port, config, baud=115200):
+    """Opens the source named by port (see the table above) for a make_config() config."""
+    url = urlsplit(port)
+    options = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    if url.scheme == "sim":
+        return SyntheticSource(config["packet_fields"], config["total_sensors"], config["packet_crc"],
+                               rate=float(options.get("rate", 50)),
+                               noise=float(options.get("noise", 40)),
+                               ber=float(options.get("ber", 0)),
+                               burst=int(options.get("burst", 1)),
+                               seed=int(options["seed"]) if "seed" in options else None)
+
+    if url.scheme == "replay":
+        return ReplaySource(url.netloc + url.path, config, speed=float(options.get("speed", 1)))
+
+    return SerialSource(port, baud)
+
+
+class SerialSource:
+    """A real port, or any pyserial URL such as loop:// or socket://host:port."""
+
+    def __init__(self, port, baud, timeout=READ_TIMEOUT):
+        self.ser = serial.serial_for_url(port, baud, timeout=timeout)
+
+    def read(self):
+        # Blocks until at least one byte arrives (or the timeout), then takes everything waiting
+        return self.ser.read(max(1, self.ser.in_waiting))
+
+    def write(self, data):
+        self.ser.write(data)
+
+    def flush(self):
+        self.ser.flush() # Returns once the bytes have left the host
+
+    def close(self):
+        self.ser.close()
+
+
+class PacketEncoder:
+    """Builds 0xAA 0x55-framed packets in a session's layout from NumPy columns."""
+
+    def __init__(self, fields, adc_channels, crc=None):
+        _, self.dtype = packet_layout(fields, adc_channels, crc)
+        self.crc = PACKET_CRCS[crc] if crc is not None else None
+
+    def encode(self, columns, count):
+        """columns maps field name -> scalar or length-count array; missing fields are 0."""
+        packets = np.zeros(count, dtype=self.dtype)
+        for name, values in columns.items():
+            packets[name] = values
+
+        frames = np.empty((count, len(SYNC) + self.dtype.itemsize), dtype=np.uint8)
+        frames[:, :len(SYNC)] = np.frombuffer(SYNC, dtype=np.uint8)
+        frames[:, len(SYNC):] = packets.view(np.uint8).reshape(count, -1)
+
+        if self.crc is not None:
+            # Trailer covers everything between the sync and itself
+            for frame in frames:
+                crc = self.crc(frame[len(SYNC):-2].tobytes())
+                frame[-2], frame[-1] = crc & 0xFF, crc >> 8
+
+        return frames.tobytes()
+
+
+class SyntheticSource:
+    """Stand-in for the test stand, for load tests without hardware.
+
+    Emits `rate` packets per second (0 = as fast as the reader takes them)
+    with slow sine signals plus Gaussian noise of `noise` counts per channel.
+    Packets leave in bursts of `burst`, so the average rate is unchanged
+    but arrival is lumpy like a radio link, and each emitted bit is flipped
+    with probability `ber`. Valve commands written to it are echoed back
+    in the solenoids field, like the real stand.
+    """
+
+    def __init__(self, fields, adc_channels, crc=None, rate=50.0, noise=40.0, ber=0.0, burst=1, seed=None,
+                 timeout=READ_TIMEOUT):
+        self.encoder = PacketEncoder(fields, adc_channels, crc)
+        self.channels = adc_channels
+        self.rate = rate
+        self.noise = noise
+        self.ber = ber
+        self.burst = max(1, burst)
+        self.timeout = timeout
+        self.rng = np.random.default_rng(seed)
+
+        self.phase = self.rng.uniform(0, 2 * np.pi, adc_channels)
+        self.period = self.rng.uniform(2, 20, adc_channels) # Seconds per sine cycle
+        self.solenoids = 0x8000
+        self.sent = 0
+        self.start = time.perf_counter()
+
+    def _due(self):
+        """Packets owed by now, rounded down to whole bursts."""
+        owed = int((time.perf_counter() - self.start) * self.rate) - self.sent
+        return owed // self.burst * self.burst
+
+    def read(self):
+        if self.rate > 0:
+            deadline = time.perf_counter() + self.timeout
+            count = self._due()
+            while count == 0:
+                # Sleep until the next burst is owed, or give up at the timeout
+                wait = (self.sent + self.burst) / self.rate - (time.perf_counter() - self.start)
+                if time.perf_counter() + wait > deadline:
+                    time.sleep(max(0.0, deadline - time.perf_counter()))
+                    return b""
+                time.sleep(max(0.0, wait))
+                count = self._due()
+        else:
+            count = SIM_UNTHROTTLED_BATCH
+
+        seq = np.arange(self.sent, self.sent + count, dtype=np.uint64)
+        t = seq / self.rate if self.rate > 0 else (time.perf_counter() - self.start) + np.zeros(count)
+        self.sent += count
+
+        wave = np.sin(2 * np.pi * t[:, None] / self.period + self.phase)
+        adc = SIM_COUNTS_MID + SIM_COUNTS_SWING * wave + self.rng.normal(0, self.noise, (count, self.channels))
+
+        data = self.encoder.encode({
+            "timestamp": (t * 1e6).astype(np.uint64) & 0xFFFFFFFF,
+            "seq": seq & 0xFFFFFFFF,
+            "mask": (1 << min(self.channels, 8)) - 1,
+            "solenoids": self.solenoids,
+            "adc": np.clip(adc, 0, 0xFFFF),
+        }, count)
+
+        if self.ber > 0:
+            data = self._corrupt(data)
+        return data
+
+    def _corrupt(self, data):
+        bits = len(data) * 8
+        flips = self.rng.binomial(bits, self.ber)
+        if not flips:
+            return data
+
+        buffer = np.frombuffer(data, dtype=np.uint8).copy()
+        positions = self.rng.integers(0, bits, flips)
+        np.bitwise_xor.at(buffer, positions // 8, (1 << (positions % 8)).astype(np.uint8))
+        return buffer.tobytes()
+
+    def write(self, data):
+        for match in COMMAND_PATTERN.finditer(data):
+            self.solenoids = int(match.group(1), 16)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ReplaySource:
+    """Replays a raw capture (.raw) or telemetry CSV at `speed` x real time.
+
+    Raw captures are replayed chunk for chunk on their recorded host
+    timing; CSV rows are re-encoded in the session's packet layout and
+    paced by the step between consecutive timestamps, so a board reset or
+    counter wrap (timestamp going backwards) just restarts the clock. speed=0 replays as fast as the reader
+    takes it. Writes (valve commands) are discarded.
+    """
+
+    def __init__(self, path, config, speed=1.0, timeout=READ_TIMEOUT):
+        self.speed = speed
+        self.timeout = timeout
+        self.pending = None # (due time in recording seconds, bytes) not yet released
+
+        if str(path).endswith(".csv"):
+            self.encoder = PacketEncoder(config["packet_fields"], config["total_sensors"], config["packet_crc"])
+            self.file = open(path, newline="")
+            self.records = self._csv_records(csv.reader(self.file))
+        else:
+            self.file = CaptureReader(path)
+            self.records = iter(self.file)
+
+        self.origin = None # Recording time of the first record
+        self.start = time.perf_counter()
+
+    def _csv_records(self, reader):
+        next(reader) # Header
+        elapsed = 0.0 # Recording seconds since the first row
+        previous = None
+
+        for row in reader:
+            ts, seq, solenoids, *adc = row
+            if previous is not None:
+                elapsed += max(0, int(ts) - previous) * CSV_TIMESTAMP_SCALE
+            previous = int(ts)
+
+            data = self.encoder.encode({
+                "timestamp": int(ts),
+                "seq": int(seq),
+                "solenoids": int(solenoids, 2),
+                "adc": [int(float(v)) for v in adc],
+            }, 1)
+            yield elapsed, data
+
+    def read(self):
+        chunks = []
+        deadline = time.perf_counter() + self.timeout
+
+        while True:
+            if self.pending is None:
+                self.pending = next(self.records, None)
+                if self.pending is None:
+                    # Hand over what is left; None on the next call ends the session
+                    return b"".join(chunks) if chunks else None
+
+            t, data = self.pending
+            if self.origin is None:
+                self.origin = t
+
+            if self.speed > 0:
+                due = self.start + (t - self.origin) / self.speed
+                now = time.perf_counter()
+                if due > now:
+                    if chunks or due > deadline:
+                        # Release what is due now; wait for the rest on a later read
+                        if not chunks:
+                            time.sleep(max(0.0, deadline - now))
+                        return b"".join(chunks)
+                    time.sleep(due - now)
+
+            chunks.append(data)
+            self.pending = None
+
+            if self.speed == 0 and len(chunks) >= SIM_UNTHROTTLED_BATCH:
+                return b"".join(chunks)
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,590 @@
+import atexit
+import binascii
+import csv
+import io
+import json
+import queue
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+SYNC = b'\xAA\x55'
+
+LOG_FLUSH_INTERVAL = 0.1 # Seconds between telemetry CSV flushes
+LOG_FLUSH_BYTES = 4096 # ...or sooner once this much text is waiting
+LOG_QUEUE_SIZE = 10000 # Row batches buffered between serial_worker and the logger thread
+LOG_PUT_TIMEOUT = 0.5 # Seconds between checks that the logger thread is still alive while the queue is full
+
+FRAMER_COMPACT_BYTES = 64 * 1024 # Consumed bytes kept before the framer buffer is shifted
+
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+EVENT_LOG_LINES = 500 # Entries kept for the GUI log panel
+EVENT_LOG_INTERVAL = 1.0 # Min seconds between entries sharing a rate-limit key
+
+LINK_WINDOW = 10.0 # Seconds covered by the rolling loss / rate / jitter figures
+LINK_REORDER_WINDOW = 1024 # Seqs this far either side of the newest are gaps / late packets; further is a reset
+
+CAPTURE_MAGIC = b"GSCRAW1\n"
+CAPTURE_RECORD = struct.Struct("<dI") # Host monotonic time (s), chunk length
+CAPTURE_BUFFER = 64 * 1024
+
+# Header layout sent ahead of the ADC counts, as in the "packet" section of session_config.json
+DEFAULT_PACKET_FIELDS = [["timestamp", "I"], ["seq", "I"], ["mask", "B"], ["status", "B"], ["solenoids", "H"]]
+
+PACKET_TYPES = {"B": "u1", "b": "i1", "H": "<u2", "h": "<i2", "I": "<u4", "i": "<i4", "f": "<f4"}
+
+# Optional little-endian uint16 trailer over the payload (everything between sync and trailer),
+# named by "crc" in the packet section of session_config.json
+PACKET_CRCS = {
+    "crc16-ccitt": lambda data: binascii.crc_hqx(data, 0xFFFF), # poly 0x1021, init 0xFFFF
+}
+
+# --- PACKET FRAMING ---
+
+def packet_layout(fields, adc_channels, crc=None):
+    """Compiles a packet description into (struct format, NumPy dtype).
+
+    fields is the [name, struct code] list from session_config.json; the
+    ADC counts follow as one uint16 "adc" sub-array of adc_channels values,
+    then a uint16 "crc" field when a CRC trailer is declared.
+    """
+    if crc is not None and crc not in PACKET_CRCS:
+        raise ValueError(f"Unknown packet crc {crc!r} (expected one of {', '.join(PACKET_CRCS)})")
+
+    packet_format = "<" + "".join(code for _, code in fields) + f"{adc_channels}H"
+    layout = [(name, PACKET_TYPES[code]) for name, code in fields] + [("adc", "<u2", (adc_channels,))]
+
+    if crc is not None:
+        packet_format += "H"
+        layout.append(("crc", "<u2"))
+
+    return packet_format, np.dtype(layout)
+
+class PacketFramer:
+    """Splits a serial byte stream into 0xAA 0x55-prefixed packets.
+
+    Bytes are appended to one reusable buffer and consumed by moving a read
+    cursor. The consumed prefix is only dropped once it reaches
+    FRAMER_COMPACT_BYTES, so the cost of shifting the buffer is spread over
+    many packets. batch() decodes every complete frame into one NumPy
+    structured array.
+
+    With a CRC trailer, a frame that fails its check is treated as a false
+    sync: the framer moves one byte past it and searches again. good, bad
+    and skipped_bytes count accepted frames, failed checks and bytes
+    discarded while resyncing.
+    """
+
+    def __init__(self, fields, adc_channels, crc=None):
+        _, self.dtype = packet_layout(fields, adc_channels, crc)
+        self.crc = PACKET_CRCS[crc] if crc is not None else None
+        self.frame_size = len(SYNC) + self.dtype.itemsize
+        self.frame_dtype = np.dtype([("sync", "V2"), ("packet", self.dtype)])
+        self.buffer = bytearray()
+        self.cursor = 0
+
+        self.good = 0
+        self.bad = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data):
+        if self.cursor >= FRAMER_COMPACT_BYTES:
+            del self.buffer[:self.cursor]
+            self.cursor = 0
+        self.buffer += data
+
+    def frame_offsets(self):
+        """Consumes every complete frame and returns their start offsets."""
+        buffer = self.buffer
+        frame_size = self.frame_size
+        end = len(buffer)
+        pos = self.cursor
+        offsets = []
+
+        crc = self.crc
+        view = memoryview(buffer) if crc is not None else None
+
+        try:
+            while end - pos >= frame_size:
+                # Back-to-back frames are the normal case; only search after junk
+                if buffer[pos] == 0xAA and buffer[pos + 1] == 0x55:
+                    sync_index = pos
+                else:
+                    sync_index = buffer.find(SYNC, pos)
+
+                if sync_index == -1:
+                    # No header: drop the junk but keep a last byte that may be half a header
+                    self.skipped_bytes += end - 1 - pos
+                    pos = end - 1
+                    break
+
+                self.skipped_bytes += sync_index - pos
+
+                # Need full header + payload
+                if end - sync_index < frame_size:
+                    pos = sync_index
+                    break
+
+                frame_end = sync_index + frame_size
+
+                if crc is not None:
+                    expected = buffer[frame_end - 2] | (buffer[frame_end - 1] << 8)
+                    if crc(view[sync_index + len(SYNC):frame_end - 2]) != expected:
+                        # False sync or corrupted frame: step past this sync and look again
+                        self.bad += 1
+                        self.skipped_bytes += 1
+                        pos = sync_index + 1
+                        continue
+
+                offsets.append(sync_index)
+                pos = frame_end
+        finally:
+            # The buffer can't be resized while a view is exported
+            if view is not None:
+                view.release()
+
+        self.good += len(offsets)
+        self.cursor = pos
+        return offsets
+
+    def batch(self):
+        """Every complete packet in the buffer as one structured array (self.dtype)."""
+        offsets = self.frame_offsets()
+        if not offsets:
+            return np.empty(0, dtype=self.dtype)
+
+        first, last = offsets[0], offsets[-1]
+        count = len(offsets)
+
+        if last - first == (count - 1) * self.frame_size:
+            # One unbroken run: a single strided view over the buffer
+            frames = np.frombuffer(self.buffer, dtype=self.frame_dtype, count=count, offset=first)
+            return frames["packet"].copy()
+
+        # Junk between frames: gather each frame's bytes, then reinterpret
+        raw = np.frombuffer(self.buffer, dtype=np.uint8)
+        rows = raw[np.asarray(offsets)[:, None] + np.arange(self.frame_size)]
+        return rows.view(self.frame_dtype)[:, 0]["packet"].copy()
+
+# --- CSV LOGGING ---
+
+def telemetry_headers(num_p, num_t, num_lc):
+    headers = ["timestamp", "seq", "solenoids"]
+    headers += [f"P_{i}" for i in range(num_p)]
+    headers += [f"T_{i}" for i in range(num_t)]
+    headers += [f"LC_{i}" for i in range(num_lc)]
+    return headers
+
+def telemetry_row(ts, seq, solenoids, adc_values):
+    return [ts, seq, f"{solenoids:016b}", *adc_values]
+
+class TelemetryLogger:
+    """Writes telemetry rows to CSV from its own thread.
+
+    serial_worker only queues raw values; formatting and disk writes happen
+    here, batched and flushed every LOG_FLUSH_INTERVAL seconds or
+    LOG_FLUSH_BYTES of text, and always once more on close(). If the
+    thread dies (e.g. a full disk) the error is kept in .error and later
+    rows are counted in .dropped instead of blocking the caller.
+    """
+    _CLOSE = object()
+
+    def __init__(self, path, headers):
+        self.file = open(path, "w", newline='')
+        self.batch = io.StringIO()
+        self.writer = csv.writer(self.batch)
+        self.writer.writerow(headers)
+
+        # Bounded so a stalled disk can't grow memory without limit; a full
+        # queue makes log_batch() wait rather than drop rows
+        self.rows = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.closed = False
+        self.error = None # Exception that stopped the logger thread
+        self.dropped = 0 # Rows not written because of it
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+        # Last-chance flush if the GUI exits without disconnecting
+        atexit.register(self.close)
+
+    def log_batch(self, batch):
+        """Queues a structured array from PacketFramer.batch() as one item."""
+        if len(batch) and not self._put(list(zip(batch["timestamp"].tolist(), batch["seq"].tolist(),
+                                                  batch["solenoids"].tolist(), batch["adc"].tolist()))):
+            self.dropped += len(batch)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self._put(self._CLOSE)
+        self.thread.join()
+
+    def _put(self, item):
+        """Waits for queue space while the logger thread is alive; False once it has died."""
+        while self.thread.is_alive():
+            try:
+                self.rows.put(item, timeout=LOG_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _flush(self):
+        self.file.write(self.batch.getvalue())
+        self.file.flush()
+        self.batch.seek(0)
+        self.batch.truncate()
+
+    def _run(self):
+        next_flush = time.monotonic() + LOG_FLUSH_INTERVAL
+
+        try:
+            while True:
+                try:
+                    rows = self.rows.get(timeout=max(0.0, next_flush - time.monotonic()))
+                except queue.Empty:
+                    rows = None
+
+                if rows is self._CLOSE:
+                    break
+
+                if rows is not None:
+                    self.writer.writerows(telemetry_row(*row) for row in rows)
+
+                if self.batch.tell() >= LOG_FLUSH_BYTES or time.monotonic() >= next_flush:
+                    self._flush()
+                    next_flush = time.monotonic() + LOG_FLUSH_INTERVAL
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                self._flush()
+            except Exception as e:
+                self.error = self.error or e
+            try:
+                self.file.close()
+            except OSError:
+                pass # Handle is released either way; the write error is already kept
+
+# --- EVENT LOG ---
+
+class EventLog:
+    """Leveled, rate-limited event log kept in a ring buffer for the GUI panel.
+
+    Callers pass a %-format string plus its arguments; nothing is formatted
+    until the panel reads the entries (or the entry is echoed to the
+    console), so a filtered or suppressed call costs a dict lookup. Calls
+    that pass key= are let through at most once per `interval` seconds, and
+    the next entry that gets through reports how many were suppressed.
+    """
+
+    def __init__(self, level="INFO", echo="INFO", maxlen=EVENT_LOG_LINES, interval=EVENT_LOG_INTERVAL):
+        self.level = LOG_LEVELS[level]
+        self.echo = LOG_LEVELS[echo] # Entries at or above this also go to stdout
+        self.interval = interval
+        self.entries = deque(maxlen=maxlen)
+        self.version = 0 # Bumped per stored entry so the panel can skip redraws
+        self.limits = {} # key -> [last stored (monotonic s), suppressed since]
+        self.lock = threading.Lock()
+        self.file_entries = None # Stored entries waiting for the session log writer thread
+        self.file_thread = None
+
+    def open_file(self, path):
+        """Also appends every stored entry to a session log file.
+
+        Entries are formatted and written by a background thread, so log()
+        stays an append for whichever thread calls it.
+        """
+        self.close_file()
+        file = open(path, "a") # First, so a failed open leaves no half-set-up writer behind
+
+        entries = queue.SimpleQueue()
+        self.file_thread = threading.Thread(target=self._write_file, args=(file, entries), daemon=True)
+        self.file_thread.start()
+        self.file_entries = entries
+
+    def close_file(self):
+        """Writes out everything logged so far, then closes the session log."""
+        if self.file_entries is not None:
+            self.file_entries.put(None)
+            self.file_thread.join()
+            self.file_entries = None
+            self.file_thread = None
+
+    def _write_file(self, file, entries):
+        with file:
+            while True:
+                entry = entries.get()
+                if entry is None:
+                    break
+                file.write(self.format(entry) + "\n")
+                if entries.empty():
+                    file.flush() # Caught up: let the file show what has happened so far
+
+    def log(self, level, msg, *args, key=None):
+        level_no = LOG_LEVELS[level]
+        if level_no < self.level:
+            return
+
+        suppressed = 0
+        with self.lock:
+            if key is not None:
+                now = time.monotonic()
+                limit = self.limits.get(key)
+
+                if limit is not None and now - limit[0] < self.interval:
+                    limit[1] += 1
+                    return
+
+                if limit is not None:
+                    suppressed = limit[1]
+                self.limits[key] = [now, 0]
+
+            entry = (time.time(), level, msg, args, suppressed)
+            self.entries.append(entry)
+            self.version += 1
+
+        file_entries = self.file_entries
+        if file_entries is not None:
+            file_entries.put(entry)
+
+        if level_no >= self.echo:
+            print(self.format(entry))
+
+    def debug(self, msg, *args, key=None):
+        self.log("DEBUG", msg, *args, key=key)
+
+    def info(self, msg, *args, key=None):
+        self.log("INFO", msg, *args, key=key)
+
+    def warning(self, msg, *args, key=None):
+        self.log("WARNING", msg, *args, key=key)
+
+    def error(self, msg, *args, key=None):
+        self.log("ERROR", msg, *args, key=key)
+
+    @staticmethod
+    def format(entry):
+        t, level, msg, args, suppressed = entry
+        text = msg % args if args else msg
+        if suppressed:
+            text += f" (+{suppressed} suppressed)"
+        return f"{time.strftime('%H:%M:%S', time.localtime(t))} [{level}] {text}"
+
+    def lines(self):
+        """Formatted entries, oldest first."""
+        with self.lock:
+            entries = list(self.entries)
+        return [self.format(e) for e in entries]
+
+# --- LINK STATISTICS ---
+
+class LinkStats:
+    """Tracks packet loss and timing on the live link from the seq field.
+
+    seq is a uint32 counter that increments once per packet, so a short
+    jump forward is a gap (tentatively lost), a repeat of the newest seq is
+    a duplicate, and a seq slightly behind the newest fills an earlier gap
+    (reordered) or repeats an older packet (duplicate). Counters wrap at
+    2**32. A seq more than LINK_REORDER_WINDOW away in either direction is
+    a sender restart or a corrupted seq, and counts as a reset, not loss.
+    Arrival times are host times per read, so packets in the same read
+    count as arriving together.
+    """
+
+    def __init__(self, window=LINK_WINDOW):
+        self.window = window
+        self.newest = None
+        self.missing = set() # Gap seqs still young enough to arrive late
+
+        self.received = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.wraps = 0
+        self.resets = 0
+
+        self.recent = deque() # (host time, packets received, packets lost) per update
+        self.intervals = deque() # (host time, seconds since the previous packet)
+        self.last_arrival = None
+
+    def update(self, seqs, t):
+        """Accounts for the seqs (list of ints) that arrived at host time t."""
+        if not seqs:
+            return
+
+        lost = 0
+        newest = self.newest
+
+        for seq in seqs:
+            if newest is None:
+                newest = seq
+                continue
+
+            delta = (seq - newest) & 0xFFFFFFFF
+
+            if delta == 1:
+                pass
+            elif delta == 0:
+                self.duplicates += 1
+                continue
+            elif delta <= LINK_REORDER_WINDOW + 1:
+                lost += delta - 1
+                self.missing.update((newest + k) & 0xFFFFFFFF for k in range(1, delta))
+            elif 0x100000000 - delta <= LINK_REORDER_WINDOW:
+                # Behind the newest: either fills a gap or is a repeat
+                if seq in self.missing:
+                    self.missing.remove(seq)
+                    self.reordered += 1
+                    lost -= 1
+                else:
+                    self.duplicates += 1
+                continue
+            else:
+                self.resets += 1
+                self.missing.clear()
+
+            if seq < newest and delta <= LINK_REORDER_WINDOW + 1:
+                self.wraps += 1
+            newest = seq
+
+        self.newest = newest
+        self.received += len(seqs)
+        self.lost += lost
+
+        if len(self.missing) > 2 * LINK_REORDER_WINDOW:
+            self.missing = {m for m in self.missing if (newest - m) & 0xFFFFFFFF <= LINK_REORDER_WINDOW}
+
+        if self.last_arrival is not None:
+            self.intervals.append((t, t - self.last_arrival))
+        self.intervals.extend((t, 0.0) for _ in range(len(seqs) - 1))
+        self.last_arrival = t
+
+        self.recent.append((t, len(seqs), lost))
+        self._expire(t)
+
+    def _expire(self, t):
+        cutoff = t - self.window
+        while self.recent and self.recent[0][0] < cutoff:
+            self.recent.popleft()
+        while self.intervals and self.intervals[0][0] < cutoff:
+            self.intervals.popleft()
+
+    def snapshot(self, t):
+        """Totals plus rolling loss %, packet rate (Hz), mean interval and jitter (ms)."""
+        self._expire(t)
+
+        received = sum(r[1] for r in self.recent)
+        lost = max(0, sum(r[2] for r in self.recent))
+
+        # Packets that arrived after the oldest update, over the time they took to arrive
+        if len(self.recent) > 1:
+            span = self.recent[-1][0] - self.recent[0][0]
+            rate_hz = (received - self.recent[0][1]) / span if span > 0 else 0.0
+        else:
+            rate_hz = 0.0
+
+        if self.intervals:
+            gaps = np.fromiter((i[1] for i in self.intervals), dtype=np.float64, count=len(self.intervals))
+            interval_ms, jitter_ms = float(gaps.mean()) * 1e3, float(gaps.std()) * 1e3
+        else:
+            interval_ms = jitter_ms = 0.0
+
+        return {
+            "received": self.received,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "reordered": self.reordered,
+            "wraps": self.wraps,
+            "resets": self.resets,
+            "loss_pct": 100.0 * lost / (received + lost) if received + lost else 0.0,
+            "rate_hz": rate_hz,
+            "interval_ms": interval_ms,
+            "jitter_ms": jitter_ms,
+        }
+
+# --- RAW CAPTURE ---
+
+class RawCapture:
+    """Append-only record of every byte read from the port.
+
+    File layout: CAPTURE_MAGIC, a uint32 length + JSON metadata block, then
+    one CAPTURE_RECORD header (host monotonic time, length) + raw bytes per
+    ser.read() chunk. Writes only copy into a large file buffer, so this is
+    cheap enough to run on the serial thread. The capture is best effort: a
+    write error (e.g. a full disk) stops it, is kept in .error, and later
+    chunks are only counted in .dropped_bytes.
+    """
+
+    def __init__(self, path, metadata):
+        self.file = open(path, "wb", buffering=CAPTURE_BUFFER)
+
+        meta = json.dumps(metadata).encode()
+        self.file.write(CAPTURE_MAGIC)
+        self.file.write(struct.pack("<I", len(meta)))
+        self.file.write(meta)
+        self.error = None # OSError that stopped the capture
+        self.dropped_bytes = 0 # Bytes not captured because of it
+
+    def write(self, chunk, t=None):
+        if self.error is not None:
+            self.dropped_bytes += len(chunk)
+            return
+
+        try:
+            self.file.write(CAPTURE_RECORD.pack(time.monotonic() if t is None else t, len(chunk)))
+            self.file.write(chunk)
+        except OSError as e:
+            self.error = e
+            self.dropped_bytes += len(chunk)
+            self.close()
+
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            self.file.close() # Flushes the buffer, so a full disk can fail here too
+        except OSError as e:
+            self.error = self.error or e
+
+class CaptureReader:
+    """Iterates (monotonic_time, chunk) pairs from a RawCapture file."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+
+        if self.file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a raw capture file")
+
+        (meta_len,) = struct.unpack("<I", self.file.read(4))
+        self.metadata = json.loads(self.file.read(meta_len))
+
+    def __iter__(self):
+        while True:
+            header = self.file.read(CAPTURE_RECORD.size)
+            if len(header) < CAPTURE_RECORD.size:
+                return
+
+            t, length = CAPTURE_RECORD.unpack(header)
+            chunk = self.file.read(length)
+
+            # A record cut short by a crash ends the capture
+            if len(chunk) < length:
+                return
+
+            yield t, chunk
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()